@@ -0,0 +1,162 @@
+"""
+心率告警规则。
+
+在 color_config.ini 中每个 [Alert 名称] 段落是一条规则，例如：
+
+    [Alert high]
+    above = 170
+    for = 10
+    hysteresis = 3
+    color = red
+
+    [Alert zone4]
+    zone = 4
+    color = orange
+    hook = python notify.py
+
+above / below / zone 决定心率区间，for 为持续多少秒后触发，
+hysteresis 为退出时需要额外越过的 bpm，避免在阈值附近反复触发。
+触发时可以改变主窗口颜色（color）或执行命令（hook，环境变量 HR_ALERT / HR_BPM）。
+"""
+import math
+import os
+import subprocess
+from bisect import bisect_right
+from collections import namedtuple
+
+from config import zone_bounds
+
+ALERT_PREFIX = "Alert "
+
+# 区间为 [low, high)，无界的一侧为 -inf / inf
+Rule = namedtuple("Rule", ["name", "low", "high", "duration", "hysteresis", "color", "hook"])
+
+
+def rule_from_section(name, section):
+    low, high = -math.inf, math.inf
+    if "zone" in section:
+        bounds = zone_bounds()
+        zone = section.getint("zone")
+        if not 0 <= zone <= len(bounds):
+            raise ValueError(f"zone must be between 0 and {len(bounds)}, got {zone}")
+        if zone > 0:
+            low = bounds[zone - 1]
+        if zone < len(bounds):
+            high = bounds[zone]
+    if "above" in section:
+        low = section.getfloat("above")
+    if "below" in section:
+        high = section.getfloat("below")
+    return Rule(
+        name=name,
+        low=low,
+        high=high,
+        duration=section.getfloat("for", 0.0),
+        hysteresis=section.getfloat("hysteresis", 0.0),
+        color=section.get("color"),
+        hook=section.get("hook"),
+    )
+
+
+def load_rules(config):
+    """从 ConfigParser 中读取所有 [Alert 名称] 段落，按出现顺序返回 Rule 列表"""
+    rules = []
+    for section in config.sections():
+        if section.startswith(ALERT_PREFIX):
+            name = section[len(ALERT_PREFIX):].strip()
+            try:
+                rules.append(rule_from_section(name, config[section]))
+            except ValueError as e:
+                print(f"Invalid alert rule {name}: {e}")
+    return rules
+
+
+class IntervalIndex:
+    """
+    把一组 [low, high) 区间编译成有序边界。
+    相邻边界之间的每一段预先算好覆盖它的区间集合，查询时二分查找，O(log n)。
+    """
+
+    def __init__(self, intervals):
+        """:param intervals: (low, high, item) 列表"""
+        self.bounds = sorted({b for low, high, _ in intervals for b in (low, high) if math.isfinite(b)})
+        # 第 i 段为 [bounds[i-1], bounds[i])，第 0 段从 -inf 开始，最后一段到 inf 为止
+        points = [-math.inf] + self.bounds
+        self.segments = [
+            frozenset(item for low, high, item in intervals if low <= point < high)
+            for point in points
+        ]
+
+    def lookup(self, value):
+        return self.segments[bisect_right(self.bounds, value)]
+
+
+class AlertEngine:
+    def __init__(self, rules, on_change=None):
+        """
+        :param rules: Rule 列表
+        :param on_change: 告警状态变化时的回调 on_change(rule, active, timestamp, value)
+        """
+        self.rules = list(rules)
+        self.on_change = on_change
+        self.enter_index = IntervalIndex([(r.low, r.high, r) for r in self.rules])
+        self.hold_index = IntervalIndex([(r.low - r.hysteresis, r.high + r.hysteresis, r) for r in self.rules])
+        self.pending = {}   # 已进入区间、尚未达到持续时间的规则 -> 进入时间
+        self.active = set()
+        self.last_holding = None
+        self.last_entering = None
+
+    def evaluate(self, timestamp, value):
+        """处理一个样本；只处理命中的和正在计时/触发中的规则，与规则总数无关"""
+        if value is None:
+            return
+        holding = self.hold_index.lookup(value)
+        if holding is not self.last_holding:
+            self.last_holding = holding
+            for rule in [r for r in self.pending if r not in holding]:
+                del self.pending[rule]
+            for rule in [r for r in self.active if r not in holding]:
+                self.active.discard(rule)
+                self._notify(rule, False, timestamp, value)
+
+        entering = self.enter_index.lookup(value)
+        # 仍在同一段内时，没有规则离开，命中的规则也都已经在计时或触发中，不必再遍历
+        if entering is not self.last_entering:
+            self.last_entering = entering
+            # 滞回只推迟已触发告警的解除；计时中的规则一离开 [low, high) 就重新计时
+            for rule in [r for r in self.pending if r not in entering]:
+                del self.pending[rule]
+            for rule in entering:
+                if rule not in self.pending and rule not in self.active:
+                    self.pending[rule] = timestamp
+
+        if self.pending:
+            for rule, since in list(self.pending.items()):
+                if timestamp - since >= rule.duration and rule in entering:
+                    del self.pending[rule]
+                    self.active.add(rule)
+                    self._notify(rule, True, timestamp, value)
+
+    def __call__(self, sample):
+        """作为总线订阅者使用"""
+        self.evaluate(sample.timestamp, sample.value)
+
+    def active_rules(self):
+        """当前触发中的规则，按配置中的顺序"""
+        return [r for r in self.rules if r in self.active]
+
+    def _notify(self, rule, active, timestamp, value):
+        if self.on_change:
+            try:
+                self.on_change(rule, active, timestamp, value)
+            except Exception as e:
+                print(f"Error handling alert {rule.name}: {e}")
+
+
+def run_hook(rule, value):
+    """在后台执行告警命令，不等待其结束"""
+    env = dict(os.environ, HR_ALERT=rule.name, HR_BPM=str(value))
+    try:
+        subprocess.Popen(rule.hook, shell=True, env=env)
+    except Exception as e:
+        print(f"Error running hook for alert {rule.name}: {e}")
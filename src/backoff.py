@@ -0,0 +1,25 @@
+import time
+
+
+class Backoff:
+    """失败后的指数退避，各个数据源共用同一套策略"""
+
+    def __init__(self, initial=1.0, maximum=60.0, factor=2.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.delay = 0.0
+        self.next_attempt = 0.0
+
+    def ready(self, now=None):
+        return (now if now is not None else time.monotonic()) >= self.next_attempt
+
+    def failure(self, now=None):
+        """记录一次失败，返回下次尝试前需要等待的秒数"""
+        self.delay = min(self.maximum, self.delay * self.factor) if self.delay else self.initial
+        self.next_attempt = (now if now is not None else time.monotonic()) + self.delay
+        return self.delay
+
+    def reset(self):
+        self.delay = 0.0
+        self.next_attempt = 0.0
@@ -7,6 +7,7 @@ import random
 from PIL import Image, ImageDraw, ImageTk
 
 from config import COLOR, ART_FONT, CONFIG_FILE
+from font_cache import load_cached_families, system_families, preview_font
 
 
 # 配置文件名
@@ -39,7 +40,7 @@ class ColorFontSelector:
     def __init__(self, root):
         self.root = root
         self.root.title("选择文本颜色和字体")
-        self.root.geometry("800x400+400+200")  # 较大窗口
+        self.root.geometry("800x480+400+200")  # 较大窗口
         self.root.resizable(False, False)
         self.root.configure(bg="#f0f0f0")
         self.set_palette_icon()
@@ -47,15 +48,23 @@ class ColorFontSelector:
         if os.path.exists(CONFIG_FILE):
             config = configparser.ConfigParser()
             config.read(CONFIG_FILE)
-            self.chosen_color = config["Settings"].get("font_color", DEFAULT_COLOR)
-            self.chosen_font = config["Settings"].get("font", DEFAULT_FONT)
+            self.chosen_color = config.get("Settings", "font_color", fallback=DEFAULT_COLOR)
+            self.chosen_font = config.get("Settings", "font", fallback=DEFAULT_FONT)
         else:
             self.chosen_color = DEFAULT_COLOR
             self.chosen_font = DEFAULT_FONT
 
+        # 字体列表：优先使用磁盘缓存，没有缓存时先显示预设字体，窗口出现后再枚举系统字体
+        cached = load_cached_families()
+        self.all_fonts = cached or FONT_LIST
+        self.filtered_fonts = self.all_fonts
+        self.last_query = ""
+
         # 创建页面布局：左侧颜色选择，右侧字体选择，下方预览区域和操作按钮
         self.create_widgets()
         self.update_preview()
+        if cached is None:
+            self.root.after(50, self.load_system_fonts)
 
     def set_palette_icon(self):
         size = (64, 64)
@@ -97,15 +106,26 @@ class ColorFontSelector:
         # 右侧：字体选择区域
         font_label = tk.Label(right_frame, text="字体选择：", bg="#f0f0f0", fg="#333333", font=("微软雅黑", 16))
         font_label.pack(pady=(10,20))
-        self.font_var = tk.StringVar(value=self.chosen_font)
-        self.font_optionmenu = tk.OptionMenu(right_frame, self.font_var, *FONT_LIST, command=self.on_font_change)
-        self.font_optionmenu.config(bg="#ffffff", fg="#333333", font=("微软雅黑", 14), width=15, relief=tk.FLAT)
-        self.font_optionmenu["menu"].config(bg="#ffffff", fg="#333333", font=("微软雅黑", 12))
-        self.font_optionmenu.pack(pady=(0,10))
+        # 输入即搜索，下方列表只显示匹配的字体
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.on_search())
+        search_entry = tk.Entry(right_frame, textvariable=self.search_var, bg="#ffffff", fg="#333333",
+                                font=("微软雅黑", 12), relief=tk.FLAT, width=24)
+        search_entry.pack(pady=(0,5))
+        list_frame = tk.Frame(right_frame, bg="#f0f0f0")
+        list_frame.pack(pady=(0,10))
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side="right", fill="y")
+        self.font_listbox = tk.Listbox(list_frame, bg="#ffffff", fg="#333333", font=("微软雅黑", 12),
+                                       width=24, height=8, relief=tk.FLAT, exportselection=False,
+                                       yscrollcommand=scrollbar.set)
+        self.font_listbox.pack(side="left")
+        scrollbar.config(command=self.font_listbox.yview)
+        self.font_listbox.bind("<<ListboxSelect>>", lambda e: self.on_font_select())
+        self.show_fonts(self.filtered_fonts)
 
         # 底部：预览区域（跨两列），显示随机心率效果
-        self.preview_label = tk.Label(main_frame, text="", bg="#f0f0f0", fg=self.chosen_color,
-                                      font=(self.chosen_font, 24))
+        self.preview_label = tk.Label(main_frame, text="", bg="#f0f0f0", fg=self.chosen_color)
         self.preview_label.grid(row=1, column=0, columnspan=2, pady=(20,10))
 
         # 底部按钮区域：保存和取消
@@ -125,6 +145,36 @@ class ColorFontSelector:
             self.color_display.config(bg=self.chosen_color)
             self.update_preview()
 
+    def load_system_fonts(self):
+        """枚举系统字体（结果会写入磁盘缓存，下次打开时直接读取）"""
+        self.all_fonts = system_families(self.root)
+        self.last_query = None  # 强制按当前输入重新过滤
+        self.on_search()
+
+    def on_search(self):
+        query = self.search_var.get().strip().lower()
+        # 输入是在上一次的基础上追加字符时，只需在上一次的结果里继续过滤
+        if self.last_query and query.startswith(self.last_query):
+            candidates = self.filtered_fonts
+        else:
+            candidates = self.all_fonts
+        self.filtered_fonts = [f for f in candidates if query in f.lower()] if query else self.all_fonts
+        self.last_query = query
+        self.show_fonts(self.filtered_fonts)
+
+    def show_fonts(self, fonts):
+        self.font_listbox.delete(0, tk.END)
+        self.font_listbox.insert(tk.END, *fonts)
+        if self.chosen_font in fonts:
+            index = fonts.index(self.chosen_font)
+            self.font_listbox.selection_set(index)
+            self.font_listbox.see(index)
+
+    def on_font_select(self):
+        selection = self.font_listbox.curselection()
+        if selection:
+            self.on_font_change(self.font_listbox.get(selection[0]))
+
     def on_font_change(self, value):
         self.chosen_font = value
         self.update_preview()
@@ -132,10 +182,14 @@ class ColorFontSelector:
     def update_preview(self):
         random_hr = random.randint(60, 120)
         preview_text = f"{random_hr} bpm"
-        self.preview_label.config(text=preview_text, fg=self.chosen_color, font=(self.chosen_font, 24))
+        # 字体对象按字体名缓存，切换颜色或重复选择同一字体时不再经过 Tk 解析
+        self.preview_font = preview_font(self.chosen_font, 24)
+        self.preview_label.config(text=preview_text, fg=self.chosen_color, font=self.preview_font)
 
     def save_config(self):
+        # 保留配置文件中的其他段落（如额外的显示窗口）
         config = configparser.ConfigParser()
+        config.read(CONFIG_FILE)
         config["Settings"] = {
             "font_color": self.chosen_color,
             "font": self.chosen_font
@@ -8,3 +8,31 @@ STROMNO_URL = os.getenv("STROMNO_URL")
 COLOR = os.getenv("COLOR")
 ART_FONT = os.getenv("FONT")
 CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL", 500))
+SOURCE = os.getenv("SOURCE") or "browser"  # 数据源：browser（无头 Chrome）或 http（纯 HTTP 轮询）
+HTTP_SOURCE_URL = os.getenv("HTTP_SOURCE_URL")  # http 数据源轮询的地址，SOURCE=http 时必须设置
+ARTIFACT_FILTER = os.getenv("ARTIFACT_FILTER", "1") != "0"  # 是否剔除传感器异常值
+RECORD_DIR = os.getenv("RECORD_DIR")  # 设置后把每次运行的样本录制为 CSV
+STANDBY_SOURCE = os.getenv("STANDBY_SOURCE", "0") == "1"  # 是否启用热备数据源
+STANDBY_INTERVAL = float(os.getenv("STANDBY_INTERVAL") or 10)  # 主源正常时备用源的轮询间隔（秒）
+# 输出：OUTPUT_FILE / OUTPUT_FIFO / OUTPUT_UDP / OUTPUT_OSC 设置目标后启用，
+# OUTPUT_<类型>_RATE 为该输出的最小写入间隔（秒）
+OUTPUT_SINKS = [
+    (kind, os.getenv(f"OUTPUT_{kind.upper()}"), float(os.getenv(f"OUTPUT_{kind.upper()}_RATE") or 0))
+    for kind in ("file", "fifo", "udp", "osc")
+    if os.getenv(f"OUTPUT_{kind.upper()}")
+]
+OUTPUT_UDP_BATCH = int(os.getenv("OUTPUT_UDP_BATCH") or 1)
+TRAY_LIVE_ICON = os.getenv("TRAY_LIVE_ICON", "1") != "0"  # 托盘图标是否显示当前心率
+TRAY_ICON_INTERVAL = float(os.getenv("TRAY_ICON_INTERVAL") or 1.0)  # 托盘图标最短更换间隔（秒）
+PROFILER = os.getenv("PROFILER", "0") == "1"  # 启动时即开启采样分析（也可在托盘菜单中开关）
+PROFILE_OUTPUT = os.getenv("PROFILE_OUTPUT") or "profile.collapsed"  # 采样结果（collapsed stack）的输出路径
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL") or 0.01)  # 采样间隔（秒）
+MAX_HR = int(os.getenv("MAX_HR") or 190)  # 最大心率，用于划分心率区间
+
+# 心率区间下限（占最大心率的比例），依次为 Z1 ~ Z5，低于 Z1 视为 Z0
+ZONE_FRACTIONS = (0.5, 0.6, 0.7, 0.8, 0.9)
+
+
+def zone_bounds(max_hr=MAX_HR):
+    """返回 Z1 ~ Z5 的心率下限（bpm）"""
+    return [round(max_hr * f) for f in ZONE_FRACTIONS]
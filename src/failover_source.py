@@ -0,0 +1,173 @@
+"""
+主备数据源。
+
+备用源在启动时就连接好，平时只按 standby_interval 低频轮询保持热备。
+主源读不到数据时，同一次 fetch 内直接改读备用源，切换耗时不超过一个采样周期。
+
+主源页面卡住但仍显示旧数值时，读数本身看不出问题（心率平稳时数值同样不变）。
+只有低频轮询发现备用源的读数与主源不同且更新时，才开始每个周期都读取备用源核对；
+这种状态持续 confirm_after 秒、且主源已经 stale_after 秒没有变化，才切换到备用源。
+"""
+import threading
+import time
+
+from pipeline import parse_bpm
+from backoff import Backoff
+
+
+class FailoverSource:
+    def __init__(self, primary, standby, standby_interval=10.0, stale_after=5.0, confirm_after=1.0,
+                 on_primary_reading=None):
+        """
+        :param primary: 主数据源
+        :param standby: 备用数据源，需与主源提供相同的 start/fetch/restart/close 接口
+        :param standby_interval: 主源正常时备用源的轮询间隔（秒）
+        :param stale_after: 主源读数至少这么多秒没有变化，才可能被判定为卡住
+        :param confirm_after: 备用源持续比主源新这么多秒后才切换，避免两个页面更新的先后差异造成误切换
+        :param on_primary_reading: 每次读取主源后的回调，参数为解析后的 bpm（失败为 None），供看门狗使用
+        """
+        self.primary = primary
+        self.standby = standby
+        self.standby_interval = standby_interval
+        self.stale_after = stale_after
+        self.confirm_after = confirm_after
+        self.on_primary_reading = on_primary_reading
+        self.name = f"{primary.name}+{standby.name}"
+
+        self.active = "primary"
+        self.standby_ready = False
+        self.standby_restarting = False
+        self.standby_backoff = Backoff(initial=5.0, maximum=300.0)
+        self.last_standby_poll = 0.0
+
+        # 各数据源最近的有效读数及其最近一次变化的时间，用来判断哪个更新鲜
+        self.primary_value = None
+        self.primary_changed = 0.0
+        self.standby_value = None
+        self.standby_changed = 0.0
+        self.suspect_since = None     # 发现备用源比主源新的时间，期间每个周期都读取备用源
+
+        # 备用源的资源开销统计
+        self.standby_polls = 0
+        self.standby_poll_time = 0.0
+        self.failovers = 0
+
+    def start(self):
+        self.primary.start()
+        # 备用源在后台启动，不拖慢程序启动
+        threading.Thread(target=self._start_standby, args=(self.standby.start,), daemon=True).start()
+
+    def _start_standby(self, start):
+        self.standby_restarting = True
+        try:
+            start()
+            self.standby_ready = True
+            self.standby_backoff.reset()
+        except Exception as e:
+            self.standby_ready = False
+            delay = self.standby_backoff.failure()
+            print(f"Error starting standby source: {e}, retrying in {delay:.0f}s")
+        finally:
+            self.standby_restarting = False
+
+    def fetch(self):
+        heart_rate = self.primary.fetch()
+        value = parse_bpm(heart_rate)
+        if self.on_primary_reading:
+            self.on_primary_reading(value)
+        now = time.monotonic()
+        if value is not None and value != self.primary_value:
+            self.primary_value = value
+            self.primary_changed = now
+
+        if value is None:
+            # 主源读不到数据：本次直接改读备用源，每个周期只产生一个读数
+            standby_reading = self.poll_standby(now)
+            if standby_reading is None:
+                return heart_rate
+            self._use_standby(f"returned {heart_rate!r}")
+            return standby_reading
+
+        standby_reading = None
+        if self.suspect_since is not None or now - self.last_standby_poll >= self.standby_interval:
+            standby_reading = self.poll_standby(now)
+            if standby_reading is not None and self._standby_ahead():
+                if self.suspect_since is None:
+                    self.suspect_since = now
+            else:
+                self.suspect_since = None
+
+        if (self.suspect_since is not None and now - self.suspect_since >= self.confirm_after
+                and now - self.primary_changed >= self.stale_after):
+            self._use_standby(f"stuck at {value}")
+            return standby_reading
+        self._use_primary()
+        return heart_rate
+
+    def _standby_ahead(self):
+        """备用源的读数与主源不同，并且比主源最近一次变化更新"""
+        return self.standby_value != self.primary_value and self.standby_changed > self.primary_changed
+
+    def _use_standby(self, reason):
+        if self.active != "standby":
+            self.failovers += 1
+            print(f"Primary source {self.primary.name} {reason}, failing over to standby")
+            self.active = "standby"
+
+    def _use_primary(self):
+        if self.active != "primary":
+            print(f"Primary source {self.primary.name} is back, switching from standby")
+            self.active = "primary"
+
+    def poll_standby(self, now):
+        """读取备用源并统计耗时；备用源失效时在后台按退避间隔重启"""
+        self.last_standby_poll = now
+        if not self.standby_ready or self.standby_restarting:
+            if not self.standby_restarting and self.standby_backoff.ready(now):
+                target = self.standby.restart if self.standby.driver is not None else self.standby.start
+                threading.Thread(target=self._start_standby, args=(target,), daemon=True).start()
+            return None
+
+        started = time.perf_counter()
+        heart_rate = self.standby.fetch()
+        self.standby_poll_time += time.perf_counter() - started
+        self.standby_polls += 1
+        value = parse_bpm(heart_rate)
+        if value is None:
+            if not self.standby.is_alive():
+                self.standby_ready = False
+            return None
+        if value != self.standby_value:
+            self.standby_value = value
+            self.standby_changed = now
+        return heart_rate
+
+    def standby_cost(self):
+        """备用源的资源开销：轮询次数、轮询总耗时、Chrome 常驻内存（字节，可能为 None）"""
+        return {
+            "polls": self.standby_polls,
+            "poll_seconds": self.standby_poll_time,
+            "memory": self.standby.memory_usage(),
+            "failovers": self.failovers,
+        }
+
+    def report_cost(self):
+        cost = self.standby_cost()
+        memory = f"{cost['memory'] / 1024 / 1024:.0f} MB" if cost["memory"] else "unknown"
+        print(f"Standby source: {cost['polls']} polls, {cost['poll_seconds']:.2f}s polling, "
+              f"memory {memory}, {cost['failovers']} failover(s)")
+
+    def is_alive(self):
+        return self.primary.is_alive()
+
+    def restart(self):
+        self.primary.restart()
+
+    def memory_usage(self):
+        usage = [self.primary.memory_usage(), self.standby.memory_usage()]
+        return sum(u for u in usage if u) or None
+
+    def close(self):
+        self.report_cost()
+        self.primary.close()
+        self.standby.close()
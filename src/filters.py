@@ -0,0 +1,163 @@
+"""
+心率数据的伪影剔除。
+
+传感器偶尔会上报明显不可能的数值（突然跳到 250 或掉到 0），
+这里用滑动中位数 + 生理变化率限制把它们过滤掉。
+"""
+import heapq
+from collections import deque
+
+
+class SlidingMedian:
+    """双堆 + 延迟删除实现的滑动中位数，每个样本 O(log n)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.low = []       # 较小的一半，最大堆（存负数）
+        self.high = []      # 较大的一半，最小堆
+        self.low_size = 0   # 堆中有效元素个数（不含待删除元素）
+        self.high_size = 0
+        self.delayed = {}   # 待删除的值 -> 次数
+
+    def __len__(self):
+        return len(self.values)
+
+    def push(self, value):
+        if not self.low or value <= -self.low[0]:
+            heapq.heappush(self.low, -value)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, value)
+            self.high_size += 1
+        self.values.append(value)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+        self._balance()
+        # 待删除元素不在堆顶时不会被清理，堆过大时按窗口内的值重建，均摊后仍为 O(log n)
+        if len(self.low) + len(self.high) > 4 * self.window:
+            self._rebuild()
+
+    def _rebuild(self):
+        ordered = sorted(self.values)
+        half = (len(ordered) + 1) // 2
+        self.low = [-v for v in ordered[:half]]
+        self.high = ordered[half:]
+        heapq.heapify(self.low)
+        heapq.heapify(self.high)
+        self.low_size = len(self.low)
+        self.high_size = len(self.high)
+        self.delayed = {}
+
+    def median(self):
+        if not self.values:
+            return None
+        if self.low_size > self.high_size:
+            return -self.low[0]
+        return (-self.low[0] + self.high[0]) / 2
+
+    def _remove(self, value):
+        self.delayed[value] = self.delayed.get(value, 0) + 1
+        if self.low and value <= -self.low[0]:
+            self.low_size -= 1
+            if value == -self.low[0]:
+                self._prune(self.low, -1)
+        else:
+            self.high_size -= 1
+            if self.high and value == self.high[0]:
+                self._prune(self.high, 1)
+
+    def _prune(self, heap, sign):
+        """弹出堆顶已被标记删除的元素"""
+        while heap:
+            value = sign * heap[0]
+            count = self.delayed.get(value)
+            if not count:
+                break
+            if count == 1:
+                del self.delayed[value]
+            else:
+                self.delayed[value] = count - 1
+            heapq.heappop(heap)
+
+    def _balance(self):
+        # 保证 low_size == high_size 或 low_size == high_size + 1
+        if self.low_size > self.high_size + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.low_size -= 1
+            self.high_size += 1
+            self._prune(self.low, -1)
+        elif self.low_size < self.high_size:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.high_size -= 1
+            self.low_size += 1
+            self._prune(self.high, 1)
+
+
+class ArtifactFilter:
+    """
+    伪影剔除阶段，可作为 IngestPipeline 的一个 stage 使用。
+    依次检查：生理范围、相对上一个有效值的变化率、相对滑动中位数的偏差。
+    通过则原样返回数值，被剔除则返回 None。
+
+    启动时（以及重新接受数据时）还没有可比较的有效值，需要连续 seed_count 个
+    相差不超过 tolerance 的样本才开始接受，避免单个异常值成为变化率的基准。
+    """
+
+    def __init__(self, window=9, tolerance=25, max_rate=4.0, min_bpm=30, max_bpm=230, reset_after=10.0,
+                 seed_count=3):
+        """
+        :param window: 滑动中位数窗口（样本数）
+        :param tolerance: 与中位数的最大偏差（bpm）
+        :param max_rate: 最大变化率（bpm/秒）
+        :param min_bpm: 生理下限
+        :param max_bpm: 生理上限
+        :param reset_after: 连续剔除超过该秒数后重新接受数据，避免真实的心率跳变被永久屏蔽
+        :param seed_count: 重新开始接受数据前需要的连续一致样本数
+        """
+        self.median = SlidingMedian(window)
+        self.tolerance = tolerance
+        self.max_rate = max_rate
+        self.min_bpm = min_bpm
+        self.max_bpm = max_bpm
+        self.reset_after = reset_after
+        self.last_value = None
+        self.last_time = None
+        self.seed = deque(maxlen=seed_count)    # 尚未开始接受时收集的 (时间, 数值)
+
+    def __call__(self, timestamp, value):
+        if not self.min_bpm <= value <= self.max_bpm:
+            return None
+        # 中位数窗口记录所有生理范围内的值，这样持续的真实变化最终会被中位数跟上
+        self.median.push(value)
+
+        if self.last_time is None or timestamp - self.last_time > self.reset_after:
+            return self._seed(timestamp, value)
+
+        dt = max(timestamp - self.last_time, 1.0)
+        if abs(value - self.last_value) > self.max_rate * dt:
+            return None
+        if len(self.median) > self.median.window // 2:
+            if abs(value - self.median.median()) > self.tolerance:
+                return None
+        return self._accept(timestamp, value)
+
+    def _seed(self, timestamp, value):
+        """收集到足够多、彼此一致且时间相近的样本后，以最新的一个作为基准开始接受"""
+        self.seed.append((timestamp, value))
+        if len(self.seed) < self.seed.maxlen or timestamp - self.seed[0][0] > self.reset_after:
+            return None
+        values = [v for _, v in self.seed]
+        if max(values) - min(values) > self.tolerance:
+            return None
+        # 中位数窗口里可能还是异常值或重置前的旧读数，从这组一致的样本重新开始
+        self.median = SlidingMedian(self.median.window)
+        for v in values:
+            self.median.push(v)
+        return self._accept(timestamp, value)
+
+    def _accept(self, timestamp, value):
+        self.last_value = value
+        self.last_time = timestamp
+        self.seed.clear()
+        return value
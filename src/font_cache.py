@@ -0,0 +1,83 @@
+"""
+系统字体列表的磁盘缓存。
+
+tkinter.font.families() 在字体很多的机器上很慢，这里把结果缓存到磁盘，
+以字体目录的修改时间作为指纹，安装或删除字体后自动失效。
+"""
+import hashlib
+import json
+import os
+import sys
+import tkinter.font as tkfont
+from functools import lru_cache
+
+
+def font_dirs():
+    """当前系统的字体目录（只返回存在的）"""
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        dirs = [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    elif sys.platform == "darwin":
+        dirs = ["/System/Library/Fonts", "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    else:
+        dirs = ["/usr/share/fonts", "/usr/local/share/fonts",
+                os.path.join(home, ".fonts"), os.path.join(home, ".local", "share", "fonts")]
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def cache_path():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "heart_rate_overlay", "font_cache.json")
+
+
+def fingerprint(dirs=None):
+    """字体目录（含子目录）的指纹：安装/删除字体会改变所在目录的修改时间，只需 stat 目录，不用读字体文件"""
+    digest = hashlib.sha1()
+    for top in dirs if dirs is not None else font_dirs():
+        for d, _, _ in os.walk(top):
+            try:
+                digest.update(f"{d}:{os.stat(d).st_mtime_ns};".encode())
+            except OSError:
+                continue
+    return digest.hexdigest()
+
+
+def load_cached_families(path=None):
+    """读取缓存，指纹不匹配或缓存不存在时返回 None"""
+    try:
+        with open(path or cache_path(), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("fingerprint") != fingerprint():
+        return None
+    return data.get("families")
+
+
+def save_families(families, path=None):
+    path = path or cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint(), "families": families}, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"Error saving font cache: {e}")
+
+
+def system_families(root):
+    """枚举系统字体并写入缓存（较慢，需在 Tk 主线程调用）"""
+    # Windows 上以 @ 开头的是竖排字体，对横排的心率显示没有意义
+    families = sorted({f for f in tkfont.families(root) if not f.startswith("@")}, key=str.lower)
+    save_families(families)
+    return families
+
+
+@lru_cache(maxsize=64)
+def preview_font(family, size):
+    """预览用的字体对象，同一字体只向 Tk 解析一次"""
+    return tkfont.Font(family=family, size=size)
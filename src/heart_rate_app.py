@@ -1,5 +1,4 @@
 import tkinter as tk
-import time
 import threading
 import subprocess
 import configparser
@@ -10,20 +9,21 @@ from dotenv import load_dotenv
 import win32gui
 import win32con
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
-
 import pystray
 from PIL import Image, ImageDraw
 
-from config import STROMNO_URL, COLOR, ART_FONT, CHECK_INTERVAL, CONFIG_FILE
+from config import (STROMNO_URL, SOURCE, HTTP_SOURCE_URL, COLOR, ART_FONT, CHECK_INTERVAL, CONFIG_FILE, ARTIFACT_FILTER, RECORD_DIR,
+                    STANDBY_SOURCE, STANDBY_INTERVAL, OUTPUT_SINKS, OUTPUT_UDP_BATCH,
+                    TRAY_LIVE_ICON, TRAY_ICON_INTERVAL, PROFILER, PROFILE_OUTPUT, PROFILE_INTERVAL)
 from color_config import ColorFontSelector
+from pipeline import parse_bpm
+from views import WINDOW_TITLE, create_view, load_view_configs
+from heart_rate_core import HeartRateCore, create_source
+from output_sinks import create_sinks
+from alerts import load_rules, run_hook
+from scheduler import TimerWheel
+from tray_icon import LiveTrayIcon
+from sampling_profiler import SamplingProfiler
 
 
 # ============ 全局配置 ============
@@ -39,7 +39,7 @@ from color_config import ColorFontSelector
 class HeartRateWidget:
     def __init__(self, root):
         self.root = root
-        self.root.title("Heart Rate Monitor")
+        self.root.title(WINDOW_TITLE)
         self.root.geometry("200x100")
         self.root.attributes("-topmost", True)  # 窗口置顶
         self.root.overrideredirect(True)        # 隐藏窗口边框
@@ -65,26 +65,46 @@ class HeartRateWidget:
 
         self.set_position()
 
-        self.start_browser()
+        # 所有周期任务（读取心率、置顶、检查配置等）共用一个定时器轮
+        self.scheduler = TimerWheel(tick=0.1, tk_root=self.root)
+
+        # 数据源、处理管线、总线，以及告警、录制、输出和看门狗；soak_test 使用同一套组装
+        source_url = HTTP_SOURCE_URL if SOURCE == "http" else STROMNO_URL
+        self.core = HeartRateCore(
+            create_source(SOURCE, source_url, standby=STANDBY_SOURCE, standby_interval=STANDBY_INTERVAL),
+            self.scheduler,
+            artifact_filter=ARTIFACT_FILTER,
+            record_dir=RECORD_DIR,
+            sinks=create_sinks(OUTPUT_SINKS, udp_batch=OUTPUT_UDP_BATCH),
+            on_alert=self.on_alert,
+        )
 
-        # 启动后台线程获取心率数据
-        threading.Thread(target=self.update_heart_rate_thread, daemon=True).start()
+        # 主窗口和额外的显示窗口也是总线的订阅者
+        self.core.bus.subscribe(lambda sample: self.root.after(0, self.show_sample, sample), name="overlay")
+        self.views = {}
 
-        # 后台线程保证窗口置顶
-        threading.Thread(target=self.force_always_on_top, daemon=True).start()
+        # 定时保证窗口置顶；SetWindowPos 在 Tk 主线程卡住时可能阻塞，放在自己的线程里，不拖住调度线程
+        self.scheduler.register("always_on_top", 0.5, self.force_always_on_top, mode="worker")
 
         self.setup_tray_icon()
 
-        # 启动定时器：每隔一段时间检查配置文件是否更新
+        # 每隔一段时间检查配置文件是否更新
         self.last_mtime = None
         self.check_config_file()
+        self.scheduler.register("config_file", CHECK_INTERVAL / 1000, self.check_config_file, mode="tk")
+        self.core.start()
+
+        # 采样分析默认关闭，关闭时不创建任何线程或任务
+        self.profiler = None
+        if PROFILER:
+            self.start_profiler()
 
     def load_font_color(self, default=COLOR):
         """读取配置文件中的字体颜色，如无则返回默认颜色"""
         config = configparser.ConfigParser()
         if os.path.exists(CONFIG_FILE):
             config.read(CONFIG_FILE)
-            return config["Settings"].get("font_color", default)
+            return config.get("Settings", "font_color", fallback=default)
         else:
             return default
         
@@ -93,7 +113,7 @@ class HeartRateWidget:
         config = configparser.ConfigParser()
         if os.path.exists(CONFIG_FILE):
             config.read(CONFIG_FILE)
-            return config["Settings"].get("font", default)
+            return config.get("Settings", "font", fallback=default)
         else:
             return default
 
@@ -107,14 +127,54 @@ class HeartRateWidget:
                 new_color = self.load_font_color(default=self.font_color)
                 if new_color != self.font_color:
                     self.font_color = new_color
-                    self.label.config(fg=self.font_color)
+                    self.update_label_color()
                 # 重新读取字体
                 new_font = self.load_art_font(default=self.art_font)
                 if new_font != self.art_font:
                     self.art_font = new_font
                     self.label.config(font=(self.art_font, 28, "bold"))
-        # 通过 Tk 的定时器机制循环调用
-        self.root.after(CHECK_INTERVAL, self.check_config_file)
+                self.sync_views()
+                self.load_alerts()
+                if self.live_icon:
+                    self.live_icon.refresh()
+
+    def sync_views(self):
+        """按配置文件中的 [View 名称] 段落创建、更新或关闭额外的显示窗口"""
+        config = configparser.ConfigParser()
+        config.read(CONFIG_FILE)
+        sections = dict(load_view_configs(config))
+        for name in list(self.views):
+            if name not in sections or self.views[name].needs_rebuild(sections[name]):
+                self.views.pop(name).close()
+        for name, section in sections.items():
+            if name in self.views:
+                self.views[name].reload(section, self.font_color, self.art_font)
+                continue
+            view = create_view(self.root, name, section, self.font_color, self.art_font)
+            if view:
+                view.attach(self.core.bus)
+                self.views[name] = view
+
+    def load_alerts(self):
+        """从配置文件的 [Alert 名称] 段落重新编译告警规则"""
+        config = configparser.ConfigParser()
+        config.read(CONFIG_FILE)
+        self.core.set_rules(load_rules(config))
+        self.update_label_color()
+
+    def on_alert(self, rule, active, timestamp, value):
+        """告警状态变化（在数据线程中调用）"""
+        if active:
+            print(f"Alert {rule.name} triggered at {value} bpm")
+            if rule.hook:
+                run_hook(rule, value)
+        if rule.color:
+            self.root.after(0, self.update_label_color)
+
+    def update_label_color(self):
+        """有带颜色的告警触发时使用告警颜色（配置中靠后的优先），否则使用字体颜色"""
+        colors = [rule.color for rule in self.core.alerts.active_rules() if rule.color]
+        self.label.config(fg=colors[-1] if colors else self.font_color)
 
     def set_position(self):
         """动态设置窗口位置，确保不超出屏幕"""
@@ -135,64 +195,38 @@ class HeartRateWidget:
         window_y = self.root.winfo_y() + y_offset
         self.root.geometry(f"+{window_x}+{window_y}")
 
-    def start_browser(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--log-level=3")
-        chrome_options.add_argument("--window-size=800x600")
-
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=chrome_options
-        )
-        self.driver.get(STROMNO_URL)
-
-    def fetch_heart_rate(self):
-        """从 Stromno 页面获取心率数据"""
-        try:
-            if hasattr(self, 'heart_rate_element'):
-                heart_rate = self.heart_rate_element.text.strip()
-            else:
-                self.heart_rate_element = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.ID, "widget-bpm"))
-                )
-                heart_rate = self.heart_rate_element.text.strip()
-            return heart_rate
-        except StaleElementReferenceException:
-            try:
-                self.heart_rate_element = self.driver.find_element(By.ID, "widget-bpm")
-                return self.heart_rate_element.text.strip()
-            except Exception as e:
-                print(f"Error fetching heart rate (stale recovery): {e}")
-                return "N/A"
-        except TimeoutException as e:
-            print(f"Timeout fetching heart rate: {e}")
-            return "N/A"
-        except Exception as e:
-            print(f"Error fetching heart rate: {e}")
-            return "N/A"
-
-    def update_heart_rate_thread(self):
-        """在后台线程中定时更新心率数据"""
-        while True:
-            heart_rate = self.fetch_heart_rate()
-            self.root.after(0, lambda hr=heart_rate: self.label.config(text=f"{hr} bpm"))
-            time.sleep(0.5)
+    def show_sample(self, sample):
+        """显示过滤后的心率；被剔除的异常值不显示，保留上一个读数"""
+        if sample.value is not None:
+            self.label.config(text=f"{sample.value} bpm")
+        elif parse_bpm(sample.raw) is None:
+            self.label.config(text=f"{sample.raw} bpm")
 
     def force_always_on_top(self):
-        while True:
-            hwnd = win32gui.FindWindow(None, "Heart Rate Monitor")
+        titles = [WINDOW_TITLE] + [view.title for view in list(self.views.values())]
+        for title in titles:
+            hwnd = win32gui.FindWindow(None, title)
             if hwnd:
                 win32gui.SetWindowPos(hwnd, win32con.HWND_TOPMOST, 0, 0, 0, 0,
-                                      win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_SHOWWINDOW)
-            time.sleep(0.5)
-
-    def close_browser(self):
-        try:
-            self.driver.quit()
-        except Exception as e:
-            print(f"Error closing browser: {e}")
+                                      win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_SHOWWINDOW
+                                      | win32con.SWP_ASYNCWINDOWPOS)
+
+    def start_profiler(self):
+        self.profiler = SamplingProfiler(interval=PROFILE_INTERVAL)
+        self.profiler.start(self.scheduler)
+        print(f"Sampling profiler started, writing to {PROFILE_OUTPUT} when stopped")
+
+    def stop_profiler(self):
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        profiler.report(PROFILE_OUTPUT)
+
+    def close(self):
+        """退出前停止周期任务，关闭浏览器和录制文件"""
+        if self.profiler:
+            self.stop_profiler()
+        self.core.close()
+        self.scheduler.report()
 
     # ============== 系统托盘相关代码 ==============
     def create_image(self):
@@ -204,13 +238,21 @@ class HeartRateWidget:
 
     def setup_tray_icon(self):
         image = self.create_image()
-        # 菜单包含“更改颜色/字体”和“退出”
+        # 菜单包含“更改颜色/字体”、“性能采样”开关和“退出”
         menu = pystray.Menu(
             pystray.MenuItem("更改颜色/字体", self.on_change_color),
+            pystray.MenuItem("性能采样", self.on_toggle_profiler, checked=lambda item: self.profiler is not None),
             pystray.MenuItem("退出", self.on_quit)
         )
         self.tray_icon = pystray.Icon("heart_rate_monitor", image, "Heart Rate Monitor", menu)
-        threading.Thread(target=self.tray_icon.run, daemon=True).start()
+        threading.Thread(target=self.tray_icon.run, daemon=True, name="tray").start()
+
+        # 托盘图标显示当前心率，隐藏悬浮窗时也能看到
+        self.live_icon = None
+        if TRAY_LIVE_ICON:
+            self.live_icon = LiveTrayIcon(self.tray_icon, lambda: (self.font_color, self.art_font),
+                                          min_interval=TRAY_ICON_INTERVAL)
+            self.core.bus.subscribe(self.live_icon, name="tray_icon")
         
     def open_color_config(self):
         config_window = tk.Toplevel(self.root)
@@ -221,15 +263,21 @@ class HeartRateWidget:
         # subprocess.Popen(["python", "color_config.py"])
         self.root.after(0, self.open_color_config)
 
+    def on_toggle_profiler(self, icon, item):
+        if self.profiler:
+            self.stop_profiler()
+        else:
+            self.start_profiler()
+
     def on_quit(self, icon, item):
-        self.close_browser()
+        self.close()
         icon.stop()
         self.root.quit()
 
 def main():
     root = tk.Tk()
     app = HeartRateWidget(root)
-    root.protocol("WM_DELETE_WINDOW", lambda: [app.close_browser(), root.destroy()])
+    root.protocol("WM_DELETE_WINDOW", lambda: [app.close(), root.destroy()])
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+"""
+程序核心：数据源、处理管线、总线，以及不依赖界面的订阅者（告警、录制、输出、看门狗）和对应的周期任务。
+
+heart_rate_app 在此基础上加上窗口、额外显示窗口和托盘图标；soak_test 直接驱动同一个核心，
+两边的组装方式不会各自演变。
+"""
+from pipeline import IngestPipeline
+from filters import ArtifactFilter
+from sample_bus import SampleBus
+from recorder import SessionRecorder
+from alerts import AlertEngine
+from failover_source import FailoverSource
+from source_watchdog import SourceWatchdog
+
+
+def create_source(kind, url, standby=False, standby_interval=10.0):
+    """
+    按配置创建数据源，浏览器相关的依赖只在需要时导入。
+    :param kind: "browser"（无头 Chrome）或 "http"（纯 HTTP 轮询）
+    :param standby: 是否为浏览器数据源加一个热备浏览器
+    """
+    if kind == "http":
+        from http_source import HttpSource
+        if not url:
+            raise ValueError("SOURCE=http requires HTTP_SOURCE_URL to be set")
+        return HttpSource(url)
+
+    from stromno_source import BrowserSource, LIGHT_CHROME_ARGS
+    if standby:
+        # 主源读不到数据时要在同一个 0.5 秒周期内读完备用源，两边等待元素的时间加起来要小于一个周期
+        primary = BrowserSource(url, element_timeout=0.2)
+        backup = BrowserSource(url, chrome_args=LIGHT_CHROME_ARGS, name="standby", element_timeout=0.2)
+        return FailoverSource(primary, backup, standby_interval=standby_interval)
+    return BrowserSource(url)
+
+
+class HeartRateCore:
+    def __init__(self, source, scheduler, artifact_filter=True, record_dir=None, sinks=(),
+                 poll_interval=0.5, on_alert=None):
+        """
+        :param source: 数据源，需提供 start/fetch/is_alive/restart/memory_usage/close
+        :param scheduler: TimerWheel，读取心率和看门狗任务登记在上面，由 start() 启动
+        :param artifact_filter: 是否剔除传感器异常值
+        :param record_dir: 录制目录，为空时不录制
+        :param sinks: SinkWorker 列表
+        :param poll_interval: 读取心率的间隔（秒）
+        :param on_alert: 告警状态变化时的回调，见 AlertEngine
+        """
+        self.source = source
+        self.scheduler = scheduler
+        self.on_alert = on_alert
+
+        # 数据处理管线：原始读数经过各个 stage（如伪影剔除）后发布到总线
+        self.bus = SampleBus()
+        self.pipeline = IngestPipeline(on_sample=self.bus.publish)
+        if artifact_filter:
+            self.pipeline.add_stage(ArtifactFilter())
+
+        self.recorder = None
+        if record_dir:
+            self.recorder = SessionRecorder(record_dir)
+            self.recorder_subscription = self.bus.subscribe(self.recorder, name="recorder")
+
+        # 告警规则可随时替换（见 set_rules），订阅者通过 self.alerts 间接调用
+        self.alerts = AlertEngine([], on_change=on_alert)
+        self.bus.subscribe(lambda sample: self.alerts(sample), name="alerts")
+
+        # 外部输出各自在后台线程写入，慢的输出不会拖住数据线程
+        self.sinks = list(sinks)
+        for sink in self.sinks:
+            self.bus.subscribe(sink, name=sink.name)
+
+        # 在后台线程中定时获取心率数据
+        self.scheduler.register("heart_rate", poll_interval, self.poll, mode="worker")
+
+        # 看门狗：浏览器崩溃或页面失效时在后台自动重启
+        self.watchdog = SourceWatchdog(source)
+        if isinstance(source, FailoverSource):
+            # 备用源会掩盖主源的故障，看门狗直接监控主源的读数
+            source.on_primary_reading = self.watchdog.report
+        else:
+            self.bus.subscribe(self.watchdog.observe, name="watchdog")
+        self.scheduler.register("watchdog", self.watchdog.check_interval, self.watchdog.check, mode="worker")
+
+    def set_rules(self, rules):
+        """替换告警规则，正在触发的告警随旧规则一起清除"""
+        self.alerts = AlertEngine(rules, on_change=self.on_alert)
+
+    def poll(self):
+        """读取一次心率数据（由定时器轮在后台线程中调用）"""
+        self.pipeline.push(self.source.fetch())
+
+    def start(self):
+        """启动数据源（浏览器启动较慢）和定时器轮；调用前可以继续在 scheduler 上登记其他任务"""
+        self.source.start()
+        self.scheduler.start()
+
+    def close(self):
+        """停止周期任务，关闭数据源、输出和录制文件"""
+        self.scheduler.stop()
+        self.source.close()
+        for sink in self.sinks:
+            sink.stop()
+        if self.recorder:
+            self.recorder_subscription.cancel()
+            self.recorder.close()
@@ -0,0 +1,154 @@
+"""
+纯 HTTP 数据源：不启动浏览器，直接轮询返回心率的地址。
+
+复用同一个 keep-alive 连接，并带上 ETag / Last-Modified 发送条件请求，
+读数没有变化时服务器只需返回 304。响应不经过 DOM 解析，只用正则取出心率：
+支持 widget 页面中的 #widget-bpm、JSON 中的 heartRate 字段以及纯文本数字。
+"""
+import gzip
+import http.client
+import re
+import threading
+from urllib.parse import urlsplit
+
+from backoff import Backoff
+
+
+BPM_PATTERNS = [
+    # 只接受数字：页面由 JS 填充前 #widget-bpm 为空或显示 "--"，不能当作读数
+    re.compile(r"""id\s*=\s*["']widget-bpm["'][^>]*>\s*(\d+(?:\.\d+)?)\s*<""", re.IGNORECASE),
+    re.compile(r'"heartRate"\s*:\s*"?(\d+(?:\.\d+)?)'),
+    re.compile(r"^\s*(\d+(?:\.\d+)?)\s*$"),
+]
+
+
+def extract_bpm(text):
+    """从响应正文中取出心率文本，找不到时返回 None"""
+    for pattern in BPM_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+class HttpSource:
+    def __init__(self, url, name="http", timeout=5.0):
+        """
+        :param url: 返回心率的地址（widget 页面、JSON 接口或纯文本均可）
+        :param timeout: 单次请求的超时（秒）
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL for HTTP source: {url!r}")
+        self.url = url
+        self.name = name
+        self.timeout = timeout
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        self.connection = None
+        self.lock = threading.Lock()
+        self.backoff = Backoff()
+        self.etag = None
+        self.last_modified = None
+        self.last_value = "N/A"
+
+        self.requests = 0
+        self.not_modified = 0
+        self.connections = 0
+
+    def start(self):
+        """连接在第一次 fetch 时建立，这里不做阻塞操作"""
+        pass
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.connection = cls(self.host, timeout=self.timeout)
+        self.connections += 1
+
+    def _disconnect(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _request(self):
+        headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        self.connection.request("GET", self.path, headers=headers)
+        response = self.connection.getresponse()
+        # 必须读完正文，连接才能复用
+        body = response.read()
+        if response.will_close:
+            self._disconnect()
+        return response, body
+
+    def fetch(self):
+        """读取心率；失败时按退避间隔重试，等待期间直接返回 "N/A" """
+        if not self.backoff.ready():
+            return "N/A"
+        with self.lock:
+            try:
+                heart_rate = self._fetch()
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self._disconnect()
+                delay = self.backoff.failure()
+                print(f"Error fetching heart rate over HTTP: {e}, retrying in {delay:.0f}s")
+                heart_rate = "N/A"
+        return heart_rate
+
+    def _fetch(self):
+        if self.connection is None:
+            self._connect()
+        try:
+            response, body = self._request()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # 服务器关闭了空闲的 keep-alive 连接，重连后重试一次
+            self._disconnect()
+            self._connect()
+            response, body = self._request()
+        self.requests += 1
+
+        if response.status == 304:
+            self.not_modified += 1
+            self.backoff.reset()
+            return self.last_value
+        if response.status != 200:
+            raise ValueError(f"HTTP {response.status} {response.reason}")
+
+        if response.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        text = body.decode(response.headers.get_content_charset() or "utf-8", errors="replace")
+        heart_rate = extract_bpm(text)
+        if heart_rate is None:
+            raise ValueError("no heart rate found in response")
+
+        self.etag = response.getheader("ETag")
+        self.last_modified = response.getheader("Last-Modified")
+        self.last_value = heart_rate
+        self.backoff.reset()
+        return heart_rate
+
+    def is_alive(self):
+        """没有需要守护的进程，始终返回 True；读不到数据由看门狗按 stale 处理"""
+        return True
+
+    def restart(self):
+        """断开连接并丢弃缓存的 ETag，下一次 fetch 重新建立连接并完整读取"""
+        with self.lock:
+            self._disconnect()
+            self.etag = None
+            self.last_modified = None
+
+    def memory_usage(self):
+        """不启动外部进程"""
+        return None
+
+    def close(self):
+        with self.lock:
+            self._disconnect()
+        print(f"HTTP source: {self.requests} requests, {self.not_modified} not modified, "
+              f"{self.connections} connection(s)")
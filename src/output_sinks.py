@@ -0,0 +1,351 @@
+"""
+把心率输出到其他程序：文本文件（OBS 文本源）、命名管道、UDP、OSC（VRChat 等）。
+
+每个输出都在独立线程中运行，只保留最新的一个待写数值：
+写得慢或写失败的输出只会丢弃中间值，不会阻塞数据线程和 UI。
+"""
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+from backoff import Backoff
+
+
+class NotDelivered(Exception):
+    """没有接收方（如命名管道还没有读端），数值没有送出，稍后重发"""
+
+
+class SinkWorker:
+    """
+    输出的后台线程：按 min_interval 限速，只在数值变化时写入，失败后退避重试。
+
+    sink.write 返回实际送出的数值个数；会缓存数值的输出（UDP 合并发送）另外提供
+    buffered_since / max_latency / flush()，缓存时间超过 max_latency 时由这里调用 flush 送出。
+    """
+
+    def __init__(self, sink, min_interval=0.0, retry_interval=0.5):
+        """
+        :param min_interval: 两次写入之间的最小间隔（秒）
+        :param retry_interval: 没有接收方时重发的间隔（秒）
+        """
+        self.sink = sink
+        self.min_interval = min_interval
+        self.retry_interval = retry_interval
+        self.name = sink.name
+        self.backoff = Backoff(initial=1.0, maximum=30.0)
+        self.condition = threading.Condition()
+        self.pending = None
+        self.last_written = None
+        self.retry_at = 0.0
+        self.stopped = False
+        self.writes = 0
+        self.dropped = 0
+        self.errors = 0
+        self.thread = threading.Thread(target=self.run, daemon=True, name=f"sink:{self.name}")
+        self.thread.start()
+
+    def __call__(self, sample):
+        """总线回调：只记下最新值，立即返回"""
+        if sample.value is None:
+            return
+        with self.condition:
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = sample
+            self.condition.notify()
+
+    def _flush_in(self, now):
+        """距离缓存必须送出还有多少秒；没有缓存时返回 None"""
+        since = getattr(self.sink, "buffered_since", None)
+        return None if since is None else since + self.sink.max_latency - now
+
+    def run(self):
+        last_write = 0.0
+        while True:
+            with self.condition:
+                if self.stopped:
+                    break
+                now = time.monotonic()
+                flush_in = self._flush_in(now)
+                sample = None
+                if flush_in is None or flush_in > 0:
+                    if self.pending is None:
+                        self.condition.wait(flush_in)
+                        continue
+                    wait = max(self.min_interval - (now - last_write),
+                               self.backoff.next_attempt - now,
+                               self.retry_at - now)
+                    if wait > 0:
+                        # 等待期间新到的数值会覆盖 pending
+                        self.condition.wait(wait if flush_in is None else min(wait, flush_in))
+                        continue
+                    sample, self.pending = self.pending, None
+
+            if sample is None:
+                self._flush()
+                continue
+            if sample.value == self.last_written:
+                continue
+            last_write = time.monotonic()
+            try:
+                self.writes += self.sink.write(sample)
+                self.last_written = sample.value
+                self.backoff.reset()
+            except NotDelivered:
+                with self.condition:
+                    # 保留数值，接收方连上后重发
+                    self.retry_at = time.monotonic() + self.retry_interval
+                    if self.pending is None:
+                        self.pending = sample
+            except Exception as e:
+                self.errors += 1
+                delay = self.backoff.failure()
+                print(f"Error writing to {self.name}: {e}, retrying in {delay:.0f}s")
+                with self.condition:
+                    # 失败的数值放回去，除非已经有更新的
+                    if self.pending is None:
+                        self.pending = sample
+        self._flush()
+        self.sink.close()
+
+    def _flush(self):
+        if getattr(self.sink, "buffered_since", None) is None:
+            return
+        try:
+            self.writes += self.sink.flush()
+        except Exception as e:
+            self.errors += 1
+            print(f"Error writing to {self.name}: {e}")
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+
+
+class TextFileSink:
+    """
+    供 OBS 文本源读取的文本文件。
+    文件只打开一次，每次用一次 write 从头覆盖，避免每个样本都 open/close。
+    """
+
+    def __init__(self, path, template="{value} bpm"):
+        self.name = f"file:{path}"
+        self.path = path
+        self.template = template
+        self.width = 0
+        self.file = open(path, "wb", buffering=0)
+
+    def write(self, sample):
+        data = self.template.format(value=sample.value).encode("utf-8")
+        # 用空格补齐到写过的最大长度，文件只增不减，读取方不会读到空文件或上一次残留的字符
+        self.width = max(self.width, len(data))
+        self.file.seek(0)
+        self.file.write(data.ljust(self.width))
+        return 1
+
+    def close(self):
+        self.file.close()
+
+
+class FifoSink:
+    """
+    命名管道，每个数值一行。Windows 上为 \\\\.\\pipe\\名称，其他系统为 mkfifo 创建的文件。
+    没有读端时抛出 NotDelivered，由 SinkWorker 保留最新数值，读端连上后从最新数值开始接收。
+    """
+
+    def __init__(self, path):
+        self.name = f"fifo:{path}"
+        self.path = path
+        self.handle = None
+        if sys.platform == "win32":
+            import win32pipe
+            self.win32pipe = win32pipe
+        elif not os.path.exists(path):
+            os.mkfifo(path)
+
+    def write(self, sample):
+        data = f"{sample.value}\n".encode()
+        if sys.platform == "win32":
+            self._write_windows(data)
+            return 1
+        if self.handle is None:
+            try:
+                self.handle = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError:
+                raise NotDelivered("no reader")
+        try:
+            os.write(self.handle, data)
+        except (BrokenPipeError, BlockingIOError):
+            # 读端断开或读得太慢，重新等待读端
+            os.close(self.handle)
+            self.handle = None
+            raise NotDelivered("reader disconnected")
+        return 1
+
+    def _write_windows(self, data):
+        import win32file
+        import pywintypes
+        win32pipe = self.win32pipe
+        if self.handle is None:
+            self.handle = win32pipe.CreateNamedPipe(
+                self.path, win32pipe.PIPE_ACCESS_OUTBOUND,
+                win32pipe.PIPE_TYPE_BYTE | win32pipe.PIPE_NOWAIT,
+                1, 4096, 4096, 0, None
+            )
+        try:
+            win32pipe.ConnectNamedPipe(self.handle, None)
+        except pywintypes.error:
+            pass  # 已连接或尚无客户端，下面写入时区分
+        try:
+            win32file.WriteFile(self.handle, data)
+        except pywintypes.error:
+            # 没有读端或读端已断开，重新等待连接
+            win32pipe.DisconnectNamedPipe(self.handle)
+            raise NotDelivered("no reader")
+
+    def close(self):
+        if self.handle is None:
+            return
+        if sys.platform == "win32":
+            import win32file
+            win32file.CloseHandle(self.handle)
+        else:
+            os.close(self.handle)
+
+
+def parse_address(address, default_host="127.0.0.1"):
+    """"host:port" 或 "port" -> (host, port)"""
+    host, _, port = address.rpartition(":")
+    return host or default_host, int(port)
+
+
+class UdpSink:
+    """
+    UDP 文本输出，复用同一个 socket。
+    batch 大于 1 时攒够 batch 个数值再合并成一个数据报（每行一个数值），减少发包次数；
+    最早的数值等待超过 max_latency 秒时，不足 batch 个也会发出。
+    """
+
+    def __init__(self, address, batch=1, max_latency=1.0):
+        self.name = f"udp:{address}"
+        self.address = parse_address(address)
+        self.batch = batch
+        self.max_latency = max_latency
+        self.buffer = []
+        self.buffered_since = None
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write(self, sample):
+        """返回本次发出的数值个数，只放进缓存时为 0"""
+        self.buffer.append(f"{int(sample.timestamp * 1000)} {sample.value}")
+        if self.buffered_since is None:
+            self.buffered_since = time.monotonic()
+        if len(self.buffer) >= self.batch:
+            return self.flush()
+        return 0
+
+    def flush(self):
+        """发出缓存的所有数值；发送失败时同样清空，UDP 本身也不保证送达"""
+        if not self.buffer:
+            return 0
+        try:
+            self.socket.sendto("\n".join(self.buffer).encode(), self.address)
+            return len(self.buffer)
+        finally:
+            self.buffer.clear()
+            self.buffered_since = None
+
+    def close(self):
+        self.socket.close()
+
+
+def osc_string(value):
+    data = value.encode() + b"\0"
+    return data + b"\0" * (-len(data) % 4)
+
+
+def osc_message(address, *args):
+    """编码一条 OSC 消息，支持 int / float / bool 参数"""
+    tags = ","
+    payload = b""
+    for arg in args:
+        if isinstance(arg, bool):
+            tags += "T" if arg else "F"
+        elif isinstance(arg, int):
+            tags += "i"
+            payload += struct.pack(">i", arg)
+        else:
+            tags += "f"
+            payload += struct.pack(">f", arg)
+    return osc_string(address) + osc_string(tags) + payload
+
+
+def osc_bundle(messages):
+    """把多条 OSC 消息打包成一个 bundle（立即执行）"""
+    data = osc_string("#bundle") + struct.pack(">Q", 1)
+    for message in messages:
+        data += struct.pack(">i", len(message)) + message
+    return data
+
+
+class OscSink:
+    """
+    OSC 输出，默认发送 VRChat 常用的心率参数。
+    同一个数值的多个参数放在一个 bundle 里，一个数据报发出。
+    """
+
+    DEFAULT_PARAMETERS = (
+        ("/avatar/parameters/HR", "int"),
+        ("/avatar/parameters/HeartRateFloat", "float"),
+    )
+
+    def __init__(self, address, parameters=DEFAULT_PARAMETERS, max_bpm=255):
+        self.name = f"osc:{address}"
+        self.address = parse_address(address)
+        self.parameters = parameters
+        self.max_bpm = max_bpm
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write(self, sample):
+        messages = []
+        for path, kind in self.parameters:
+            if kind == "int":
+                messages.append(osc_message(path, int(sample.value)))
+            else:
+                # float 参数按 VRChat 习惯归一化到 -1 ~ 1
+                messages.append(osc_message(path, sample.value / self.max_bpm * 2 - 1))
+        data = messages[0] if len(messages) == 1 else osc_bundle(messages)
+        self.socket.sendto(data, self.address)
+        return 1
+
+    def close(self):
+        self.socket.close()
+
+
+SINK_TYPES = {
+    "file": TextFileSink,
+    "fifo": FifoSink,
+    "udp": UdpSink,
+    "osc": OscSink,
+}
+
+
+def create_sinks(specs, udp_batch=1):
+    """
+    根据配置创建输出，返回 SinkWorker 列表；单个输出创建失败不影响其他输出。
+    :param specs: (类型, 目标, 限速秒数) 列表，类型为 SINK_TYPES 中的键
+    :param udp_batch: UDP 输出每个数据报合并的数值个数
+    """
+    options = {"udp": {"batch": udp_batch}}
+    workers = []
+    for kind, target, rate in specs:
+        try:
+            sink = SINK_TYPES[kind](target, **options.get(kind, {}))
+            workers.append(SinkWorker(sink, min_interval=rate))
+        except Exception as e:
+            print(f"Error creating {kind} output {target}: {e}")
+    return workers
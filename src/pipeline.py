@@ -0,0 +1,50 @@
+"""
+心率数据的处理管线：原始读数 -> 解析 -> 各个 stage（过滤等） -> Sample。
+"""
+import re
+import time
+from collections import namedtuple
+
+
+# raw: 数据源给出的原始读数（页面文本或 WebSocket 中的 heartRate）
+# value: 经过所有 stage 之后的 bpm，无法解析或被过滤掉时为 None
+Sample = namedtuple("Sample", ["timestamp", "raw", "value"])
+
+_NUMBER = re.compile(r"\d+")
+
+
+def parse_bpm(raw):
+    """把 "73"、"73 bpm"、73 之类的读数解析成整数，失败返回 None"""
+    if isinstance(raw, (int, float)):
+        return int(raw)
+    if not raw:
+        return None
+    match = _NUMBER.search(str(raw))
+    return int(match.group()) if match else None
+
+
+class IngestPipeline:
+    def __init__(self, stages=None, on_sample=None):
+        """
+        :param stages: 可调用对象列表，签名为 stage(timestamp, value) -> value 或 None
+        :param on_sample: 每产生一个 Sample 时的回调
+        """
+        self.stages = list(stages or [])
+        self.on_sample = on_sample
+
+    def add_stage(self, stage):
+        self.stages.append(stage)
+
+    def push(self, raw, timestamp=None):
+        """处理一个原始读数，返回 Sample"""
+        if timestamp is None:
+            timestamp = time.time()
+        value = parse_bpm(raw)
+        for stage in self.stages:
+            if value is None:
+                break
+            value = stage(timestamp, value)
+        sample = Sample(timestamp, raw, value)
+        if self.on_sample:
+            self.on_sample(sample)
+        return sample
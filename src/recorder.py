@@ -0,0 +1,32 @@
+import os
+import time
+
+
+class SessionRecorder:
+    """
+    把样本录制为 CSV（timestamp,bpm,raw），格式与 session_analysis.py 的输入一致。
+    bpm 为过滤后的数值，被剔除时为空；raw 保留数据源的原始读数。
+    """
+
+    def __init__(self, directory, flush_interval=5.0):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, time.strftime("session_%Y%m%d_%H%M%S.csv"))
+        self.file = open(self.path, "w", encoding="utf-8", newline="")
+        self.file.write("timestamp,bpm,raw\n")
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+
+    def __call__(self, sample):
+        value = "" if sample.value is None else sample.value
+        raw = str(sample.raw).replace(",", " ").strip()
+        self.file.write(f"{int(sample.timestamp * 1000)},{value},{raw}\n")
+        now = time.monotonic()
+        if now - self.last_flush >= self.flush_interval:
+            self.file.flush()
+            self.last_flush = now
+
+    def close(self):
+        try:
+            self.file.close()
+        except Exception as e:
+            print(f"Error closing recorder: {e}")
@@ -0,0 +1,66 @@
+"""
+进程内的发布/订阅总线。
+
+数据源只连接一次，由 IngestPipeline 把 Sample 发布到总线上，
+显示窗口、录制器、输出等订阅者各自按自己的频率接收。
+"""
+import threading
+import time
+
+
+class Subscription:
+    def __init__(self, bus, callback, min_interval=0.0, name=None):
+        self.bus = bus
+        self.callback = callback
+        self.min_interval = min_interval  # 两次投递之间的最小间隔（秒），0 表示不限速
+        self.name = name or getattr(callback, "__name__", "subscriber")
+        self.last_delivery = None
+        self.delivered = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def offer(self, sample, now):
+        if self.last_delivery is not None and now - self.last_delivery < self.min_interval:
+            self.skipped += 1
+            return
+        self.last_delivery = now
+        try:
+            self.callback(sample)
+            self.delivered += 1
+        except Exception as e:
+            # 单个订阅者出错不影响其他订阅者
+            self.errors += 1
+            print(f"Error delivering sample to {self.name}: {e}")
+
+    def cancel(self):
+        self.bus.unsubscribe(self)
+
+
+class SampleBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = ()  # 写时复制，发布时无需加锁
+        self.latest = None
+
+    def subscribe(self, callback, min_interval=0.0, name=None):
+        """
+        订阅样本。callback 在发布者线程中调用，涉及 Tk 的订阅者需自行用 root.after 切回主线程。
+        :return: Subscription，可调用 cancel() 取消订阅
+        """
+        subscription = Subscription(self, callback, min_interval, name)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def publish(self, sample):
+        self.latest = sample
+        now = time.monotonic()
+        for subscription in self._subscribers:
+            subscription.offer(sample, now)
+
+    def subscriptions(self):
+        return list(self._subscribers)
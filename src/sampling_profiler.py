@@ -0,0 +1,110 @@
+"""
+采样分析器：定期抓取所有线程的调用栈，汇总成 collapsed stack 格式（可直接交给 flamegraph.pl
+或 speedscope 生成火焰图），同时记录 Tk 主循环最严重的几次卡顿。
+
+只在启用时创建线程和定时任务，关闭时没有任何开销。
+"""
+import heapq
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.01, budget=0.02, max_depth=64, stall_threshold=0.1, top_stalls=10):
+        """
+        :param interval: 采样间隔（秒）
+        :param budget: 采样本身允许占用的时间比例，超出时自动拉长间隔
+        :param max_depth: 每个调用栈最多记录的层数
+        :param stall_threshold: Tk 主循环响应延迟超过该秒数记为一次卡顿
+        :param top_stalls: 保留最严重的卡顿次数
+        """
+        self.interval = interval
+        self.budget = budget
+        self.max_depth = max_depth
+        self.stall_threshold = stall_threshold
+        self.top_stalls = top_stalls
+
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.stalls = []          # 最小堆，保留最长的 top_stalls 次 (时长, 发生时间)
+        self.started = None
+        self.running = False
+        self.thread = None
+        self.heartbeat = None
+
+    def start(self, scheduler=None):
+        """
+        开始采样。传入 TimerWheel 时额外登记一个 Tk 心跳任务，用它的延迟衡量主循环卡顿。
+        """
+        self.running = True
+        self.started = time.time()
+        self.thread = threading.Thread(target=self._run, daemon=True, name="sampling-profiler")
+        self.thread.start()
+        if scheduler is not None and scheduler.tk_root is not None:
+            self.heartbeat = scheduler.register("ui_heartbeat", 0.1, self._beat, mode="tk")
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        if self.heartbeat is not None:
+            self.heartbeat.cancel()
+            self.heartbeat = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while self.running:
+            started = time.perf_counter()
+            self.sample(skip=own)
+            cost = time.perf_counter() - started
+            self.sampling_time += cost
+            # 采样耗时 / 间隔 不超过 budget
+            time.sleep(max(self.interval, cost / self.budget))
+
+    def sample(self, skip=None):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _beat(self):
+        lateness = self.heartbeat.lateness if self.heartbeat else 0.0
+        if lateness < self.stall_threshold:
+            return
+        entry = (lateness, time.time())
+        if len(self.stalls) < self.top_stalls:
+            heapq.heappush(self.stalls, entry)
+        elif entry > self.stalls[0]:
+            heapq.heapreplace(self.stalls, entry)
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def overhead(self):
+        """采样耗时占运行时间的比例"""
+        elapsed = time.time() - self.started if self.started else 0.0
+        return self.sampling_time / elapsed if elapsed else 0.0
+
+    def report(self, path=None):
+        if path:
+            self.write_collapsed(path)
+            print(f"Profile written to {path} ({self.samples} samples, overhead {self.overhead() * 100:.2f}%)")
+        stalls = sorted(self.stalls, reverse=True)
+        if stalls:
+            print("Worst UI stalls:")
+            for duration, when in stalls:
+                print(f"  {duration * 1000:.0f} ms at {time.strftime('%H:%M:%S', time.localtime(when))}")
@@ -0,0 +1,242 @@
+"""
+统一的周期任务调度：单线程的定时器轮（timer wheel）。
+
+所有周期任务都登记到同一个轮上，周期换算成整数个 tick 并对齐到 tick 的整数倍，
+周期相同（或成倍数）的任务在同一次唤醒中一起执行。调度线程只在有任务到期时醒来，
+没有到期任务的 tick 直接跳过。
+
+任务有三种执行方式：
+    inline  在调度线程中直接执行，适合很快的操作
+    worker  在任务自己的后台线程中执行，适合可能阻塞的操作（读取网页等）
+    tk      通过 root.after 切到 Tk 主线程执行，适合操作界面的任务
+
+错过的执行不会补做：任务到期时上一次还没执行完，或者调度线程醒来时已经晚了一个以上周期，
+都计入 missed，然后对齐到下一个周期。
+"""
+import threading
+import time
+
+
+class PeriodicTask:
+    def __init__(self, wheel, name, period, callback, mode, dispatch):
+        self.wheel = wheel
+        self.name = name
+        self.period = period      # 周期（tick 数）
+        self.callback = callback
+        self.mode = mode
+        self.dispatch = dispatch
+        self.due = 0              # 下次到期的 tick
+        self.lateness = 0.0       # 本次执行相对到期时间的延迟（秒），回调中可读取
+        self.running = False
+        self.cancelled = False
+
+        self.runs = 0
+        self.missed = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+
+        if mode == "worker":
+            self.trigger = threading.Event()
+            self.due_time = 0.0
+            threading.Thread(target=self._worker, daemon=True, name=f"task:{name}").start()
+
+    @property
+    def interval(self):
+        return self.period * self.wheel.tick
+
+    def fire(self, due_time):
+        """到期时由调度线程调用；上一次还在执行则记为错过"""
+        if self.running:
+            self.missed += 1
+            return
+        self.running = True
+        if self.mode == "worker":
+            self.due_time = due_time
+            self.trigger.set()
+        elif self.mode == "tk":
+            self.dispatch(lambda: self.execute(due_time))
+        else:
+            self.execute(due_time)
+
+    def execute(self, due_time):
+        started = time.monotonic()
+        lateness = self.lateness = max(0.0, started - due_time)
+        try:
+            if not self.cancelled:
+                self.callback()
+        except Exception as e:
+            self.errors += 1
+            print(f"Error in periodic task {self.name}: {e}")
+        finally:
+            elapsed = time.monotonic() - started
+            self.runs += 1
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+            self.total_lateness += lateness
+            self.max_lateness = max(self.max_lateness, lateness)
+            self.running = False
+
+    def _worker(self):
+        while not self.cancelled:
+            self.trigger.wait()
+            self.trigger.clear()
+            if self.cancelled:
+                break
+            self.execute(self.due_time)
+
+    def cancel(self):
+        self.wheel.unregister(self)
+
+    def stats(self):
+        runs = self.runs or 1
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "runs": self.runs,
+            "missed": self.missed,
+            "errors": self.errors,
+            "avg_time": self.total_time / runs,
+            "max_time": self.max_time,
+            "avg_lateness": self.total_lateness / runs,
+            "max_lateness": self.max_lateness,
+        }
+
+
+class TimerWheel:
+    def __init__(self, tick=0.1, slots=64, tk_root=None):
+        """
+        :param tick: 最小时间粒度（秒），任务周期向上取整到 tick 的整数倍
+        :param slots: 轮的槽数，周期超过 slots 个 tick 的任务会在轮上转多圈
+        :param tk_root: 使用 tk 模式的任务需要的 Tk 根窗口
+        """
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.tk_root = tk_root
+        self.origin = time.monotonic()
+        self.current = 0          # 已处理到的 tick
+        self.condition = threading.Condition()
+        self.tasks = []
+        self.stopped = False
+        self.wakeups = 0
+        self.thread = None
+
+    def now_tick(self):
+        return int((time.monotonic() - self.origin) / self.tick)
+
+    def tick_time(self, tick):
+        return self.origin + tick * self.tick
+
+    def register(self, name, interval, callback, mode="inline"):
+        """
+        登记周期任务。
+        :param interval: 周期（秒）
+        :param mode: "inline" / "worker" / "tk"，见模块说明
+        :return: PeriodicTask，可调用 cancel() 取消，stats() 查看统计
+        """
+        dispatch = None
+        if mode == "tk":
+            root = self.tk_root
+            dispatch = lambda fn: root.after(0, fn)
+        period = max(1, round(interval / self.tick))
+        task = PeriodicTask(self, name, period, callback, mode, dispatch)
+        with self.condition:
+            # 对齐到周期的整数倍，同周期的任务落在同一个槽里一起唤醒
+            task.due = (max(self.current, self.now_tick()) // period + 1) * period
+            self._insert(task)
+            self.tasks.append(task)
+            self.condition.notify()
+        return task
+
+    def unregister(self, task):
+        with self.condition:
+            task.cancelled = True
+            if task in self.tasks:
+                self.tasks.remove(task)
+                self.slots[task.due % len(self.slots)].remove(task)
+            if task.mode == "worker":
+                task.trigger.set()
+
+    def _insert(self, task):
+        self.slots[task.due % len(self.slots)].append(task)
+
+    def _next_due(self):
+        """从当前位置向后扫描槽，返回最近的到期 tick；没有任务时返回 None"""
+        count = len(self.slots)
+        best = None
+        for offset in range(1, count + 1):
+            tick = self.current + offset
+            for task in self.slots[tick % count]:
+                if best is None or task.due < best:
+                    best = task.due
+            if best is not None and best <= tick:
+                return best
+        return best
+
+    def _advance(self, target):
+        """处理 (current, target] 之间到期的任务"""
+        count = len(self.slots)
+        # 睡过头超过一整圈时，所有任务都已到期，直接处理每个任务
+        if target - self.current >= count:
+            due = [t for t in self.tasks if t.due <= target]
+        else:
+            due = []
+            for tick in range(self.current + 1, target + 1):
+                due.extend(t for t in self.slots[tick % count] if t.due == tick)
+        self.current = target
+
+        for task in due:
+            self.slots[task.due % count].remove(task)
+            late_periods = (target - task.due) // task.period
+            if late_periods:
+                task.missed += late_periods
+            due_tick = task.due + late_periods * task.period
+            task.due = due_tick + task.period
+            self._insert(task)
+            try:
+                task.fire(self.tick_time(due_tick))
+            except Exception as e:
+                # 例如 Tk 主循环已退出时 root.after 抛出 TclError / RuntimeError，不能让调度线程退出
+                task.running = False
+                task.errors += 1
+                print(f"Error dispatching periodic task {task.name}: {e}")
+
+    def run(self):
+        with self.condition:
+            while not self.stopped:
+                next_due = self._next_due()
+                if next_due is None:
+                    self.condition.wait()
+                    continue
+                delay = self.tick_time(next_due) - time.monotonic()
+                if delay > 0:
+                    # register() 会唤醒这里重新计算
+                    self.condition.wait(delay)
+                    continue
+                self.wakeups += 1
+                self._advance(self.now_tick())
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True, name="timer-wheel")
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            for task in self.tasks:
+                task.cancelled = True
+                if task.mode == "worker":
+                    task.trigger.set()
+            self.condition.notify()
+
+    def stats(self):
+        return [task.stats() for task in list(self.tasks)]
+
+    def report(self):
+        print(f"Scheduler: {self.wakeups} wakeups in {time.monotonic() - self.origin:.0f}s")
+        for s in self.stats():
+            print(f"  {s['name']:<16} every {s['interval']:.2f}s  runs {s['runs']:<6} missed {s['missed']:<4} "
+                  f"time avg {s['avg_time'] * 1000:.1f}ms max {s['max_time'] * 1000:.1f}ms  "
+                  f"late avg {s['avg_lateness'] * 1000:.1f}ms max {s['max_lateness'] * 1000:.1f}ms")
@@ -0,0 +1,227 @@
+"""
+批量分析录制的心率会话。
+
+会话文件为 CSV，表头至少包含 timestamp（毫秒，与 Stromno 推送一致）和 bpm 两列，
+bpm 为空的行会被忽略。每个文件在独立进程中分析，全部计算基于 NumPy 向量运算。
+
+用法：
+    python session_analysis.py sessions/ --max-hr 190 --per-minute
+"""
+import argparse
+import os
+import sys
+import glob
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import MAX_HR, zone_bounds
+
+
+MAX_GAP = 5           # 相邻样本间隔超过该秒数视为断流，不做插值
+PEAK_SMOOTH = 10      # 峰值估计使用的滑动平均窗口（秒）
+REST_SMOOTH = 30      # 静息估计使用的滑动平均窗口（秒）
+REST_PERCENTILE = 5   # 静息心率取平滑后序列的该百分位
+RECOVERY_WINDOW = 60  # 恢复斜率的拟合窗口（秒）
+PEAK_SEPARATION = 120 # 两个峰值之间的最小间隔（秒）
+MIN_MINUTE_COVERAGE = 30  # 每分钟至少有这么多秒有效数据才计入逐分钟统计
+
+
+def load_session(path):
+    """读取会话文件，返回按时间排序的 (秒, bpm) 数组"""
+    data = np.genfromtxt(path, delimiter=",", names=True, usecols=("timestamp", "bpm"),
+                         dtype=float, invalid_raise=False)
+    data = np.atleast_1d(data)
+    t = data["timestamp"] / 1000.0
+    bpm = data["bpm"]
+    keep = np.isfinite(t) & np.isfinite(bpm) & (bpm > 0)
+    t, bpm = t[keep], bpm[keep]
+    order = np.argsort(t, kind="stable")
+    return t[order], bpm[order]
+
+
+def resample(t, bpm, max_gap=MAX_GAP):
+    """线性插值到 1 秒网格，返回 (网格时间, 数值, 有效掩码)"""
+    grid = np.arange(np.ceil(t[0]), np.floor(t[-1]) + 1.0)
+    if len(grid) == 0:
+        grid = t[:1].copy()
+    values = np.interp(grid, t, bpm)
+    if len(t) == 1:
+        return grid, values, np.ones(len(grid), bool)
+    # 网格点落在哪一段 [t[i-1], t[i]]，该段过长则视为断流
+    idx = np.clip(np.searchsorted(t, grid, side="right"), 1, len(t) - 1)
+    valid = (t[idx] - t[idx - 1]) <= max_gap
+    return grid, values, valid
+
+
+def rolling_mean(values, valid, window):
+    """窗口内数据全部有效时的滑动平均，其余位置为 NaN（结果与窗口起点对齐）"""
+    out = np.full(len(values), np.nan)
+    if len(values) < window:
+        return out
+    sums = np.cumsum(np.concatenate(([0.0], np.where(valid, values, 0.0))))
+    counts = np.cumsum(np.concatenate(([0], valid.astype(int))))
+    win_sum = sums[window:] - sums[:-window]
+    win_cnt = counts[window:] - counts[:-window]
+    out[:len(win_sum)] = np.where(win_cnt == window, win_sum / window, np.nan)
+    return out
+
+
+def recovery_slopes(values, valid, threshold):
+    """
+    在平滑序列中寻找高于 threshold 的峰值，对每个峰值之后 RECOVERY_WINDOW 秒做最小二乘拟合。
+    :return: 斜率数组（bpm/分钟，恢复时为负数）
+    """
+    smooth = rolling_mean(values, valid, PEAK_SMOOTH)
+    n = len(smooth)
+    span = 2 * PEAK_SEPARATION + 1
+    if n < span or n < RECOVERY_WINDOW + 1:
+        return np.empty(0)
+    filled = np.where(np.isnan(smooth), -np.inf, smooth)
+    local_max = np.full(n, np.inf)
+    local_max[PEAK_SEPARATION:n - PEAK_SEPARATION] = sliding_window_view(filled, span).max(axis=1)
+    # 平台只取第一个点
+    rising = np.concatenate(([True], filled[1:] > filled[:-1]))
+    peaks = np.flatnonzero((filled == local_max) & rising & (filled >= threshold))
+    peaks = peaks[peaks + RECOVERY_WINDOW < n]
+    if len(peaks) == 0:
+        return np.empty(0)
+
+    windows = sliding_window_view(values, RECOVERY_WINDOW + 1)[peaks]
+    window_valid = sliding_window_view(valid, RECOVERY_WINDOW + 1)[peaks].all(axis=1)
+    windows = windows[window_valid]
+    x = np.arange(RECOVERY_WINDOW + 1) - RECOVERY_WINDOW / 2
+    slopes = (windows - windows.mean(axis=1, keepdims=True)) @ x / (x @ x)
+    return slopes * 60.0
+
+
+def per_minute(grid, values, valid):
+    """逐分钟统计，返回 (分钟序号, 均值, 最小值, 最大值, 有效秒数)"""
+    minutes = ((grid - grid[0]) // 60).astype(int)[valid]
+    v = values[valid]
+    if len(v) == 0:
+        empty = np.empty(0)
+        return empty.astype(int), empty, empty, empty, empty.astype(int)
+    counts = np.bincount(minutes)
+    present = np.flatnonzero(counts)
+    means = np.bincount(minutes, weights=v)[present] / counts[present]
+    starts = np.flatnonzero(np.concatenate(([True], minutes[1:] != minutes[:-1])))
+    mins = np.minimum.reduceat(v, starts)
+    maxs = np.maximum.reduceat(v, starts)
+    return present, means, mins, maxs, counts[present]
+
+
+def analyze_session(path, max_hr=MAX_HR, max_gap=MAX_GAP):
+    """分析单个会话文件，返回可序列化的结果字典（供进程池回传）"""
+    result = {"path": path, "error": None}
+    try:
+        t, bpm = load_session(path)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    if len(t) == 0:
+        result["error"] = "没有有效样本"
+        return result
+
+    grid, values, valid = resample(t, bpm, max_gap)
+    bounds = zone_bounds(max_hr)
+    zones = np.digitize(values[valid], bounds)
+
+    rest_smooth = rolling_mean(values, valid, REST_SMOOTH)
+    peak_smooth = rolling_mean(values, valid, PEAK_SMOOTH)
+    slopes = recovery_slopes(values, valid, bounds[2])
+    minute = per_minute(grid, values, valid)
+
+    covered = minute[4] >= MIN_MINUTE_COVERAGE
+    result.update({
+        "samples": len(t),
+        "duration": float(t[-1] - t[0]),
+        "valid_seconds": int(valid.sum()),
+        "mean": float(values[valid].mean()) if valid.any() else float("nan"),
+        "resting": float(np.nanpercentile(rest_smooth, REST_PERCENTILE)) if np.isfinite(rest_smooth).any() else float("nan"),
+        "peak": float(np.nanmax(peak_smooth)) if np.isfinite(peak_smooth).any() else float(bpm.max()),
+        "zone_seconds": np.bincount(zones, minlength=len(bounds) + 1).tolist(),
+        "recoveries": len(slopes),
+        "recovery_slope": float(np.median(slopes)) if len(slopes) else float("nan"),
+        "minutes": [m[covered].tolist() for m in minute],
+    })
+    return result
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def format_number(value, fmt="{:.0f}"):
+    return "-" if value != value else fmt.format(value)
+
+
+def print_summary(results, show_minutes=False, out=sys.stdout):
+    headers = ["session", "dur", "mean", "rest", "peak", "Z1", "Z2", "Z3", "Z4", "Z5", "rec", "slope/min"]
+    rows = []
+    for r in results:
+        name = os.path.splitext(os.path.basename(r["path"]))[0]
+        if r["error"]:
+            rows.append([name, f"错误: {r['error']}"] + [""] * (len(headers) - 2))
+            continue
+        rows.append([
+            name,
+            format_duration(r["duration"]),
+            format_number(r["mean"]),
+            format_number(r["resting"]),
+            format_number(r["peak"]),
+            *[format_duration(s) for s in r["zone_seconds"][1:]],
+            str(r["recoveries"]),
+            format_number(r["recovery_slope"], "{:+.1f}"),
+        ])
+    widths = [max(len(h), *(len(row[i]) for row in rows)) if rows else len(h) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)), file=out)
+    for row in rows:
+        print("  ".join(c.ljust(w) for c, w in zip(row, widths)).rstrip(), file=out)
+
+    if show_minutes:
+        for r in results:
+            if r["error"]:
+                continue
+            print(f"\n{os.path.basename(r['path'])}", file=out)
+            print("minute  mean   low  high", file=out)
+            for m, mean, lo, hi, _ in zip(*r["minutes"]):
+                print(f"{m:<6} {mean:>5.0f} {lo:>5.0f} {hi:>5.0f}", file=out)
+
+
+def collect_files(paths):
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(sorted(glob.glob(os.path.join(p, "*.csv"))))
+        else:
+            files.extend(sorted(glob.glob(p)) or [p])
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量分析录制的心率会话")
+    parser.add_argument("paths", nargs="+", help="会话 CSV 文件或所在目录")
+    parser.add_argument("--max-hr", type=int, default=MAX_HR, help="最大心率（默认取 .env 中的 MAX_HR）")
+    parser.add_argument("--max-gap", type=float, default=MAX_GAP, help="超过该秒数的断流不做插值")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认等于 CPU 核数")
+    parser.add_argument("--per-minute", action="store_true", help="输出每个会话的逐分钟统计")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    if not files:
+        parser.error("没有找到会话文件")
+
+    n = len(files)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(analyze_session, files, [args.max_hr] * n, [args.max_gap] * n, chunksize=1))
+    print_summary(results, show_minutes=args.per_minute)
+    return 0 if all(r["error"] is None for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
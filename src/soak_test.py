@@ -0,0 +1,462 @@
+"""
+长时间运行（soak）测试。
+
+在独立进程中启动一个本地的假 Stromno 页面，以加速的频率驱动与 heart_rate_app 相同的程序核心
+（heart_rate_core：数据源、处理管线、总线、告警、输出、录制、看门狗、定时器轮）和托盘图标，定期记录 Python 堆（tracemalloc）、线程数、文件描述符/句柄数、
+本进程及子浏览器的常驻内存。预热结束后的增长超过阈值时以非 0 状态退出，并输出时间线报告。
+
+用法：
+    python soak_test.py --duration 3600 --interval 0.05 --report soak.csv
+    python soak_test.py --standby --duration 3600          # 主备两个浏览器
+    python soak_test.py --source http --duration 600       # 纯 HTTP 数据源
+    python soak_test.py --source direct --duration 600     # 不启动 Chrome，只测程序核心
+"""
+import argparse
+import csv
+import configparser
+import math
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from heart_rate_core import HeartRateCore, create_source
+from alerts import Rule
+from output_sinks import SinkWorker, TextFileSink, UdpSink, OscSink
+from scheduler import TimerWheel
+from tray_icon import LiveTrayIcon
+
+
+WIDGET_PAGE = """<!DOCTYPE html>
+<html><body>
+<span id="widget-bpm">{bpm}</span>
+<script>
+setInterval(function () {{
+    fetch("/bpm").then(function (r) {{ return r.text(); }}).then(function (t) {{
+        document.getElementById("widget-bpm").textContent = t;
+    }});
+}}, {refresh});
+</script>
+</body></html>
+"""
+
+
+class FakeHeartRate:
+    """按加速后的时间生成心率：缓慢起伏 + 噪声 + 偶尔的传感器异常值"""
+
+    def __init__(self, speed=60.0, glitch_rate=0.01):
+        self.speed = speed
+        self.glitch_rate = glitch_rate
+        self.started = time.monotonic()
+
+    def current(self):
+        t = (time.monotonic() - self.started) * self.speed
+        if random.random() < self.glitch_rate:
+            return random.choice([0, 250, 31])
+        return int(100 + 50 * math.sin(t / 600) + random.gauss(0, 2))
+
+
+class FakeStromnoServer:
+    """本地的假 Stromno widget 页面：/widget 为页面，/bpm 为当前读数"""
+
+    def __init__(self, heart_rate, refresh_ms=100):
+        self.heart_rate = heart_rate
+        self.refresh_ms = refresh_ms
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        # HTTP/1.1 才会保持 keep-alive 连接
+        Handler.protocol_version = "HTTP/1.1"
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.requests = 0
+        self.not_modified = 0
+        self.error_status = None    # 设置后所有请求都返回该状态码，用于测试数据源的错误处理
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/widget"
+
+    def handle(self, request):
+        self.requests += 1
+        if self.error_status:
+            request.send_response(self.error_status)
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+        bpm = self.heart_rate.current()
+        if bpm is None:
+            bpm = "--"  # 与真实页面尚未连上心率带时一样，显示占位符
+        if request.path.startswith("/bpm"):
+            body = str(bpm)
+            content_type = "text/plain"
+        else:
+            body = WIDGET_PAGE.format(bpm=bpm, refresh=self.refresh_ms)
+            content_type = "text/html"
+        data = body.encode()
+        etag = f'"{zlib.crc32(data):08x}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            request.send_response(304)
+            request.send_header("ETag", etag)
+            request.end_headers()
+            return
+        request.send_response(200)
+        request.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        request.send_header("ETag", etag)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def serve_fake_stromno(speed, conn, counters, stopped):
+    """子进程入口：运行假页面，把端口发回父进程，并定期把请求计数写入共享数组"""
+    server = FakeStromnoServer(FakeHeartRate(speed=speed))
+    server.start()
+    conn.send(server.port)
+    conn.close()
+    while not stopped.wait(0.5):
+        counters[0], counters[1] = server.requests, server.not_modified
+    counters[0], counters[1] = server.requests, server.not_modified
+    server.stop()
+
+
+class FakeStromnoProcess:
+    """在独立进程中运行 FakeStromnoServer，服务端的线程、连接和内存不计入被测进程的指标"""
+
+    def __init__(self, speed):
+        self.speed = speed
+        self.counters = multiprocessing.Array("l", 2)   # 请求数、304 数
+        self.stopped = multiprocessing.Event()
+        self.process = None
+        self.port = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/widget"
+
+    @property
+    def requests(self):
+        return self.counters[0]
+
+    @property
+    def not_modified(self):
+        return self.counters[1]
+
+    def start(self, timeout=10.0):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(target=serve_fake_stromno, name="fake-stromno", daemon=True,
+                                               args=(self.speed, sender, self.counters, self.stopped))
+        self.process.start()
+        sender.close()
+        try:
+            if not receiver.poll(timeout):
+                self.process.terminate()
+                raise RuntimeError("fake Stromno server did not start")
+            self.port = receiver.recv()
+        finally:
+            receiver.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+
+class DirectSource:
+    """不经过浏览器，直接读取假心率，用于只测试程序核心"""
+    name = "direct"
+
+    def __init__(self, heart_rate):
+        self.heart_rate = heart_rate
+
+    def start(self):
+        pass
+
+    def fetch(self):
+        return str(self.heart_rate.current())
+
+    def is_alive(self):
+        return True
+
+    def restart(self):
+        pass
+
+    def memory_usage(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def count_fds():
+    """本进程打开的文件描述符（Windows 上为句柄）数量"""
+    if psutil is not None:
+        process = psutil.Process()
+        return process.num_handles() if sys.platform == "win32" else process.num_fds()
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def process_rss():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def to_mb(value):
+    return None if value is None else value / 1024 / 1024
+
+
+class TrayIconStub:
+    """代替 pystray.Icon 接收 LiveTrayIcon 渲染出的图标，不需要系统托盘"""
+    icon = None
+    title = None
+
+
+# --tk 时创建的额外显示窗口，与 color_config.ini 中的 [View 名称] 段落格式相同
+SOAK_VIEWS = """
+[View badge]
+type = number
+size = 14
+rate = 1
+
+[View graph]
+type = graph
+span = 120
+"""
+
+
+class SoakTest:
+    def __init__(self, args):
+        self.args = args
+        self.heart_rate = FakeHeartRate(speed=args.speed)
+        self.server = FakeStromnoProcess(args.speed) if args.source != "direct" else None
+        self.workdir = tempfile.mkdtemp(prefix="hr_soak_")
+        self.samples = 0
+        self.timeline = []
+        self.views = []
+
+    def build_core(self):
+        """用 heart_rate_app 相同的 HeartRateCore 组装程序核心，再加上托盘图标和（--tk 时）显示窗口"""
+        args = self.args
+        if args.source == "direct":
+            source = DirectSource(self.heart_rate)
+        else:
+            source = create_source(args.source, self.server.url, standby=args.standby)
+
+        # UDP/OSC 发往本地一个只收不读的 socket，缓冲区满后内核直接丢包
+        self.udp_receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_receiver.bind(("127.0.0.1", 0))
+        udp_target = f"127.0.0.1:{self.udp_receiver.getsockname()[1]}"
+        sinks = [
+            SinkWorker(TextFileSink(os.path.join(self.workdir, "bpm.txt"))),
+            SinkWorker(UdpSink(udp_target, batch=4)),
+            SinkWorker(OscSink(udp_target), min_interval=0.2),
+        ]
+
+        self.core = HeartRateCore(source, TimerWheel(tick=min(0.1, args.interval)),
+                                  record_dir=self.workdir, sinks=sinks, poll_interval=args.interval)
+        self.core.set_rules([Rule(f"above{n}", n, math.inf, 2.0, 3.0, None, None) for n in range(80, 160, 10)])
+        self.core.bus.subscribe(self.count_sample, name="counter")
+
+        self.tray_icon = LiveTrayIcon(TrayIconStub(), lambda: ("red", "Arial"), min_interval=0.5)
+        self.core.bus.subscribe(self.tray_icon, name="tray_icon")
+
+        if args.tk:
+            # 与主窗口相同的方式，每个样本通过 root.after 切回 Tk 主线程
+            import tkinter as tk
+            from views import create_view, load_view_configs
+            self.root = tk.Tk()
+            self.root.withdraw()
+            self.label = tk.Label(self.root)
+            self.core.bus.subscribe(lambda sample: self.root.after(0, self.show, sample), name="tk")
+            config = configparser.ConfigParser()
+            config.read_string(SOAK_VIEWS)
+            for name, section in load_view_configs(config):
+                try:
+                    view = create_view(self.root, name, section, "red", "Arial")
+                except tk.TclError as e:
+                    # 透明背景（-transparentcolor）只有 Windows 上的 Tk 支持
+                    print(f"Skipping view {name}: {e}")
+                    continue
+                view.attach(self.core.bus)
+                self.views.append(view)
+        else:
+            self.root = None
+
+    def count_sample(self, sample):
+        self.samples += 1
+
+    def show(self, sample):
+        self.label.config(text=f"{sample.value} bpm")
+
+    def measure(self, elapsed):
+        heap, _ = tracemalloc.get_traced_memory()
+        row = {
+            "elapsed": round(elapsed, 1),
+            "samples": self.samples,
+            "heap_mb": to_mb(heap),
+            "rss_mb": to_mb(process_rss()),
+            "browser_mb": to_mb(self.core.source.memory_usage()),
+            "threads": threading.active_count(),
+            "fds": count_fds(),
+        }
+        self.timeline.append(row)
+        print("  ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+        return row
+
+    def wait(self, seconds):
+        """等待期间如启用了 Tk 则持续处理事件"""
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if self.root is not None:
+                self.root.update()
+                time.sleep(0.01)
+            else:
+                time.sleep(min(0.5, deadline - time.monotonic()))
+
+    def run(self):
+        args = self.args
+        tracemalloc.start(args.frames)
+        if self.server:
+            self.server.start()
+        self.build_core()
+        self.core.start()
+        started = time.monotonic()
+        try:
+            self.wait(args.warmup)
+            baseline = self.measure(time.monotonic() - started)
+            baseline_snapshot = tracemalloc.take_snapshot()
+            while time.monotonic() - started < args.duration:
+                self.wait(args.sample_every)
+                self.measure(time.monotonic() - started)
+            final_snapshot = tracemalloc.take_snapshot()
+        finally:
+            self.shutdown()
+
+        self.print_top_allocators(baseline_snapshot, final_snapshot)
+        if args.report:
+            self.write_report(args.report)
+        return self.check(baseline, self.timeline[-1])
+
+    def shutdown(self):
+        self.core.close()
+        self.udp_receiver.close()
+        if self.server:
+            self.server.stop()
+        for view in self.views:
+            view.close()
+        if self.root is not None:
+            self.root.destroy()
+
+    def print_top_allocators(self, before, after, limit=10):
+        print(f"\nTop {limit} allocation growth since warm-up:")
+        for stat in after.compare_to(before, "lineno")[:limit]:
+            print(f"  {stat}")
+
+    def write_report(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.timeline[0]))
+            writer.writeheader()
+            writer.writerows(self.timeline)
+        print(f"Timeline written to {path}")
+
+    def check(self, baseline, final):
+        """比较预热后与结束时的指标，返回失败项列表"""
+        args = self.args
+        limits = [
+            ("heap_mb", args.max_heap_growth),
+            ("rss_mb", args.max_rss_growth),
+            ("browser_mb", args.max_browser_growth),
+            ("threads", args.max_thread_growth),
+            ("fds", args.max_fd_growth),
+        ]
+        failures = []
+        print("\nGrowth since warm-up:")
+        for key, limit in limits:
+            if baseline[key] is None or final[key] is None:
+                print(f"  {key:<11} n/a")
+                continue
+            growth = final[key] - baseline[key]
+            ok = growth <= limit
+            print(f"  {key:<11} {growth:+.1f} (limit {limit})  {'OK' if ok else 'FAIL'}")
+            if not ok:
+                failures.append(key)
+        print(f"\n{self.samples} samples, {self.tray_icon.swaps} tray icon updates, "
+              f"{len(self.core.watchdog.incidents)} watchdog incident(s)")
+        if self.server:
+            print(f"{self.server.requests} requests to the fake page ({self.server.not_modified} not modified)")
+        return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="长时间运行测试，检查内存、线程和句柄泄漏")
+    parser.add_argument("--source", choices=["browser", "http", "direct"], default="browser",
+                        help="browser: 无头 Chrome 读取假页面；http: 纯 HTTP 轮询假页面；direct: 不启动浏览器")
+    parser.add_argument("--standby", action="store_true", help="browser 数据源同时启动热备浏览器（STANDBY_SOURCE）")
+    parser.add_argument("--duration", type=float, default=600, help="总时长（秒）")
+    parser.add_argument("--warmup", type=float, default=30, help="预热时长（秒），之后的增长才计入")
+    parser.add_argument("--interval", type=float, default=0.05, help="读取心率的间隔（秒），正常运行为 0.5")
+    parser.add_argument("--speed", type=float, default=60.0, help="假心率的时间加速倍数")
+    parser.add_argument("--sample-every", type=float, default=10, help="记录一次指标的间隔（秒）")
+    parser.add_argument("--frames", type=int, default=5, help="tracemalloc 记录的调用栈深度")
+    parser.add_argument("--tk", action="store_true", help="同时创建隐藏的 Tk 窗口，测试 root.after 回调")
+    parser.add_argument("--report", help="时间线 CSV 的输出路径")
+    parser.add_argument("--max-heap-growth", type=float, default=5.0, help="Python 堆增长上限（MB）")
+    parser.add_argument("--max-rss-growth", type=float, default=50.0, help="本进程常驻内存增长上限（MB）")
+    parser.add_argument("--max-browser-growth", type=float, default=150.0, help="浏览器常驻内存增长上限（MB）")
+    parser.add_argument("--max-thread-growth", type=int, default=0, help="线程数增长上限")
+    parser.add_argument("--max-fd-growth", type=int, default=5, help="文件描述符/句柄数增长上限")
+    args = parser.parse_args(argv)
+    if args.standby and args.source != "browser":
+        parser.error("--standby requires --source browser")
+
+    failures = SoakTest(args).run()
+    if failures:
+        print(f"FAILED: {', '.join(failures)}")
+        return 1
+    print("PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
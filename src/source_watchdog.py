@@ -0,0 +1,113 @@
+"""
+数据源看门狗：发现 Chrome 崩溃、页面失效或数值长时间不变时，在后台重启数据源，
+并记录每次故障的发现耗时和恢复耗时。
+"""
+import threading
+import time
+
+from backoff import Backoff
+
+
+class SourceWatchdog:
+    def __init__(self, source, check_interval=2.0, stale_after=10.0, frozen_after=120.0):
+        """
+        :param source: 需要提供 is_alive() 和 restart() 的数据源
+        :param check_interval: 健康检查间隔（秒），由调用方按此间隔定时调用 check()
+        :param stale_after: 超过该秒数没有有效读数视为故障（页面失效、元素丢失等）
+        :param frozen_after: 数值超过该秒数完全不变视为页面卡死
+        """
+        self.source = source
+        self.check_interval = check_interval
+        self.stale_after = stale_after
+        self.frozen_after = frozen_after
+        self.backoff = Backoff(initial=2.0, maximum=60.0)
+
+        now = time.monotonic()
+        self.last_good = now
+        self.last_change = now
+        self.last_value = None
+
+        self.incident = None     # 当前未恢复的故障
+        self.incidents = []      # 已恢复的故障记录
+        self.recovering = False
+
+    def observe(self, sample):
+        """订阅总线，记录最近一次有效读数和最近一次数值变化的时间"""
+        self.report(sample.value)
+
+    def report(self, value):
+        """直接上报被监控数据源的读数（解析后的 bpm，失败为 None）"""
+        if value is None:
+            return
+        now = time.monotonic()
+        self.last_good = now
+        if value != self.last_value:
+            self.last_value = value
+            self.last_change = now
+        if self.incident is not None and not self.recovering:
+            self.finish_incident(now)
+
+    def diagnose(self, now):
+        """返回 (故障原因, 故障开始时间)，正常时返回 None"""
+        # is_alive() 在 Chrome 卡死时会一直阻塞到 Selenium 的命令超时，先做不需要访问数据源的检查
+        if now - self.last_good > self.stale_after:
+            return "no valid reading", self.last_good
+        if now - self.last_change > self.frozen_after:
+            return "value frozen", self.last_change
+        if not self.source.is_alive():
+            return "driver dead", self.last_good
+        return None
+
+    def check(self):
+        if self.recovering:
+            return
+        now = time.monotonic()
+        # report() 在数据线程中可能随时把 self.incident 清空，这里只读一次
+        incident = self.incident
+        if incident is not None:
+            # 已经重启过但还没有恢复有效读数，按退避间隔再次重启
+            if now - incident["restarted_at"] > self.stale_after and self.backoff.ready(now):
+                delay = self.backoff.failure(now)
+                print(f"[watchdog] still no valid reading, relaunching again (next retry in {delay:.0f}s or more)")
+                self.relaunch(incident)
+            return
+
+        problem = self.diagnose(now)
+        if problem is None:
+            return
+        reason, since = problem
+        incident = self.incident = {
+            "reason": reason,
+            "detected_at": now,
+            "time_to_detect": now - since,
+            "restarts": 0,
+            "restarted_at": now,
+        }
+        print(f"[watchdog] {reason}, detected after {now - since:.1f}s, relaunching {self.source.name}")
+        self.relaunch(incident)
+
+    def relaunch(self, incident):
+        """在后台线程重启数据源，不阻塞 UI 和数据线程"""
+        self.recovering = True
+        incident["restarts"] += 1
+        threading.Thread(target=self._relaunch, args=(incident,), daemon=True).start()
+
+    def _relaunch(self, incident):
+        try:
+            self.source.restart()
+        except Exception as e:
+            print(f"[watchdog] relaunch failed: {e}")
+        finally:
+            incident["restarted_at"] = time.monotonic()
+            # 重启期间的数值变化不算数，重新开始计时
+            self.last_change = time.monotonic()
+            self.recovering = False
+
+    def finish_incident(self, now):
+        incident = self.incident
+        incident["time_to_recover"] = now - incident["detected_at"]
+        self.incidents.append(incident)
+        self.incident = None
+        self.backoff.reset()
+        print(f"[watchdog] recovered from {incident['reason']} in {incident['time_to_recover']:.1f}s "
+              f"(detect {incident['time_to_detect']:.1f}s, {incident['restarts']} restart(s))")
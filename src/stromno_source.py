@@ -0,0 +1,148 @@
+"""
+Stromno 数据源：通过无头 Chrome 打开 widget 页面并读取 #widget-bpm。
+"""
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+
+CHROME_ARGS = [
+    "--headless",
+    "--disable-gpu",
+    "--log-level=3",
+    "--window-size=800x600",
+]
+
+# 备用数据源使用的精简参数：小窗口、不加载图片，降低资源占用
+LIGHT_CHROME_ARGS = [
+    "--headless",
+    "--disable-gpu",
+    "--log-level=3",
+    "--window-size=400,300",
+    "--disable-extensions",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+]
+
+
+class BrowserSource:
+    def __init__(self, url, chrome_args=CHROME_ARGS, name="browser", element_timeout=10):
+        self.url = url
+        self.chrome_args = list(chrome_args)
+        self.name = name
+        self.element_timeout = element_timeout  # 等待 #widget-bpm 出现的最长时间（秒）
+        self.driver = None
+        self.heart_rate_element = None
+        self.restarting = False
+
+    def start(self):
+        self.driver = self.launch()
+        self.heart_rate_element = None
+
+    def launch(self):
+        """启动一个新的 Chrome 并打开页面，返回 driver"""
+        chrome_options = Options()
+        for arg in self.chrome_args:
+            chrome_options.add_argument(arg)
+        driver = webdriver.Chrome(
+            service=Service(ChromeDriverManager().install()),
+            options=chrome_options
+        )
+        try:
+            driver.get(self.url)
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def restart(self):
+        """
+        启动新的 Chrome 并替换旧的 driver。耗时较长，应在后台线程调用；
+        替换期间 fetch 直接返回 "N/A"，不会阻塞。
+        """
+        self.restarting = True
+        try:
+            new_driver = self.launch()
+            old_driver = self.driver
+            self.driver = new_driver
+            self.heart_rate_element = None
+        finally:
+            self.restarting = False
+        if old_driver is not None:
+            try:
+                old_driver.quit()
+            except Exception as e:
+                print(f"Error closing old browser: {e}")
+
+    def is_alive(self):
+        """driver 是否还能响应（Chrome 崩溃或 chromedriver 退出时返回 False）"""
+        driver = self.driver
+        if driver is None:
+            return False
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def memory_usage(self):
+        """chromedriver 及其所有子进程（Chrome）的常驻内存，单位字节；未安装 psutil 时返回 None"""
+        driver = self.driver
+        if psutil is None or driver is None:
+            return None
+        try:
+            process = psutil.Process(driver.service.process.pid)
+            return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+        except Exception:
+            return None
+
+    def fetch(self):
+        """从 Stromno 页面获取心率数据"""
+        if self.restarting or self.driver is None:
+            return "N/A"
+        return self._read()
+
+    def _read(self):
+        try:
+            if self.heart_rate_element is not None:
+                heart_rate = self.heart_rate_element.text.strip()
+            else:
+                # 超时很短时也要缩短轮询间隔，否则默认的 0.5 秒轮询会把等待拉长到 0.5 秒
+                wait = WebDriverWait(self.driver, self.element_timeout,
+                                     poll_frequency=min(0.5, self.element_timeout / 4))
+                self.heart_rate_element = wait.until(
+                    EC.presence_of_element_located((By.ID, "widget-bpm"))
+                )
+                heart_rate = self.heart_rate_element.text.strip()
+            return heart_rate
+        except StaleElementReferenceException:
+            try:
+                self.heart_rate_element = self.driver.find_element(By.ID, "widget-bpm")
+                return self.heart_rate_element.text.strip()
+            except Exception as e:
+                self.heart_rate_element = None
+                print(f"Error fetching heart rate (stale recovery): {e}")
+                return "N/A"
+        except TimeoutException as e:
+            print(f"Timeout fetching heart rate: {e}")
+            return "N/A"
+        except Exception as e:
+            print(f"Error fetching heart rate: {e}")
+            return "N/A"
+
+    def close(self):
+        try:
+            if self.driver is not None:
+                self.driver.quit()
+        except Exception as e:
+            print(f"Error closing browser: {e}")
@@ -0,0 +1,92 @@
+"""
+在系统托盘图标上显示当前心率。
+
+同一个 (数值, 颜色, 字体) 的图标只渲染一次，放在 LRU 缓存里；
+只有显示的数值变化时才更换图标，并且限制更换频率。
+"""
+import threading
+import time
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+ICON_SIZE = 64
+
+
+@lru_cache(maxsize=16)
+def load_font(family, size):
+    """按字体名找 TrueType 字体文件，找不到时退回 Arial 或 Pillow 自带字体"""
+    candidates = []
+    if family:
+        candidates += [family, f"{family}.ttf", f"{family.replace(' ', '')}.ttf", f"{family.lower()}.ttf"]
+    candidates += ["arial.ttf", "DejaVuSans.ttf"]
+    for name in candidates:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=256)
+def render_icon(value, color, font):
+    """渲染显示 value 的托盘图标；数字越多字号越小，保证能放下"""
+    image = Image.new("RGBA", (ICON_SIZE, ICON_SIZE), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    text = str(value)
+    size = {1: 56, 2: 48, 3: 34}.get(len(text), 26)
+    pil_font = load_font(font, size)
+    # 用 textbbox 计算居中位置，Pillow 自带的位图字体不支持 anchor 参数
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=pil_font)
+    position = ((ICON_SIZE - (right - left)) / 2 - left, (ICON_SIZE - (bottom - top)) / 2 - top)
+    draw.text(position, text, fill=color or "white", font=pil_font)
+    return image
+
+
+class LiveTrayIcon:
+    def __init__(self, icon, get_style, min_interval=1.0):
+        """
+        :param icon: pystray.Icon
+        :param get_style: 返回当前 (颜色, 字体) 的函数
+        :param min_interval: 两次更换图标之间的最小间隔（秒）
+        """
+        self.icon = icon
+        self.get_style = get_style
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.shown = None       # 当前图标对应的 (数值, 颜色, 字体)
+        self.pending = None     # 最新的数值
+        self.last_swap = 0.0
+        self.swaps = 0
+
+    def __call__(self, sample):
+        """总线回调"""
+        if sample.value is None:
+            return
+        self.pending = sample.value
+        self.update()
+
+    def update(self, force=False):
+        if self.pending is None:
+            return
+        color, font = self.get_style()
+        key = (self.pending, color, font)
+        with self.lock:
+            if key == self.shown:
+                return
+            now = time.monotonic()
+            # 限速期间不更换，下一个样本到来时再显示最新数值
+            if not force and now - self.last_swap < self.min_interval:
+                return
+            self.shown = key
+            self.last_swap = now
+        try:
+            self.icon.icon = render_icon(*key)
+            self.icon.title = f"{key[0]} bpm"
+            self.swaps += 1
+        except Exception as e:
+            print(f"Error updating tray icon: {e}")
+
+    def refresh(self):
+        """颜色或字体改变后立即重绘"""
+        self.update(force=True)
@@ -0,0 +1,197 @@
+"""
+额外的心率显示窗口。
+
+在 color_config.ini 中每个 [View 名称] 段落对应一个窗口，例如：
+
+    [View badge]
+    type = number
+    font = Arial
+    font_color = white
+    size = 14
+    x = 20
+    y = 20
+    rate = 1
+
+    [View graph]
+    type = graph
+    font_color = red
+    width = 300
+    height = 100
+    span = 120
+
+所有窗口订阅同一个 SampleBus，增加窗口不会增加新的数据源连接。
+"""
+import tkinter as tk
+from collections import deque
+
+VIEW_PREFIX = "View "
+WINDOW_TITLE = "Heart Rate Monitor"
+# 修改后可以直接应用到现有窗口的配置项，其他配置项（type/size/x/y/rate 等）变化时重新创建窗口
+STYLE_KEYS = ("font_color", "font")
+
+
+def load_view_configs(config):
+    """从 ConfigParser 中取出所有 [View 名称] 段落，返回 (名称, 段落) 列表"""
+    return [(section[len(VIEW_PREFIX):].strip(), config[section])
+            for section in config.sections() if section.startswith(VIEW_PREFIX)]
+
+
+class OverlayView:
+    """无边框、透明背景、可拖动的置顶窗口，子类负责具体绘制"""
+
+    def __init__(self, root, name, section, default_color, default_font):
+        self.root = root
+        self.name = name
+        # 置顶线程按标题查找窗口，标题在这里保存一份，避免在其他线程访问 Tk
+        self.title = f"{WINDOW_TITLE} - {name}"
+        self.window = tk.Toplevel(root)
+        self.window.title(self.title)
+        self.window.attributes("-topmost", True)
+        self.window.overrideredirect(True)
+        self.window.configure(bg="black")
+        self.window.attributes("-transparentcolor", "black")
+
+        self.layout = self.layout_options(section)
+        self.font_color = section.get("font_color", default_color)
+        self.art_font = section.get("font", default_font)
+        self.rate = section.getfloat("rate", 0.0)
+        self.create_widgets(section)
+
+        x = section.getint("x", 100)
+        y = section.getint("y", 100)
+        self.window.geometry(f"+{x}+{y}")
+
+        self.drag_widget().bind("<ButtonPress-1>", self.start_move)
+        self.drag_widget().bind("<B1-Motion>", self.do_move)
+        self.subscription = None
+
+    def create_widgets(self, section):
+        raise NotImplementedError
+
+    def drag_widget(self):
+        raise NotImplementedError
+
+    def render(self, sample):
+        raise NotImplementedError
+
+    def apply_style(self, font_color, art_font):
+        self.font_color = font_color
+        self.art_font = art_font
+
+    def attach(self, bus):
+        """订阅总线；回调在发布者线程中执行，这里切回 Tk 主线程再绘制"""
+        self.subscription = bus.subscribe(
+            lambda sample: self.root.after(0, self.render, sample),
+            min_interval=self.rate,
+            name=f"view:{self.name}"
+        )
+
+    @staticmethod
+    def layout_options(section):
+        return {key: value for key, value in section.items() if key not in STYLE_KEYS}
+
+    def needs_rebuild(self, section):
+        """颜色、字体以外的配置项有变化时，需要关闭窗口重新创建"""
+        return self.layout_options(section) != self.layout
+
+    def reload(self, section, default_color, default_font):
+        """配置文件变化时重新读取颜色和字体"""
+        font_color = section.get("font_color", default_color)
+        art_font = section.get("font", default_font)
+        if (font_color, art_font) != (self.font_color, self.art_font):
+            self.apply_style(font_color, art_font)
+
+    def start_move(self, event):
+        self.start_x = event.x
+        self.start_y = event.y
+
+    def do_move(self, event):
+        window_x = self.window.winfo_x() + event.x - self.start_x
+        window_y = self.window.winfo_y() + event.y - self.start_y
+        self.window.geometry(f"+{window_x}+{window_y}")
+
+    def close(self):
+        if self.subscription:
+            self.subscription.cancel()
+        self.window.destroy()
+
+
+class NumberView(OverlayView):
+    """只显示数字，用 size 控制大小，可作为大号数字或角标"""
+
+    def create_widgets(self, section):
+        self.size = section.getint("size", 28)
+        self.suffix = section.get("suffix", " bpm")
+        self.label = tk.Label(self.window, text="...", font=(self.art_font, self.size, "bold"),
+                              fg=self.font_color, bg="black")
+        self.label.pack(expand=True, fill="both")
+
+    def drag_widget(self):
+        return self.label
+
+    def render(self, sample):
+        if sample.value is not None:
+            self.label.config(text=f"{sample.value}{self.suffix}")
+
+    def apply_style(self, font_color, art_font):
+        super().apply_style(font_color, art_font)
+        self.label.config(fg=font_color, font=(art_font, self.size, "bold"))
+
+
+class GraphView(OverlayView):
+    """最近 span 秒的心率曲线"""
+
+    def create_widgets(self, section):
+        self.width = section.getint("width", 300)
+        self.height = section.getint("height", 100)
+        self.span = section.getfloat("span", 120.0)
+        self.points = deque()
+        self.canvas = tk.Canvas(self.window, width=self.width, height=self.height,
+                                bg="black", highlightthickness=0)
+        self.canvas.pack()
+        # 复用同一条折线和文字，每次只更新坐标
+        self.line = self.canvas.create_line(0, 0, 0, 0, fill=self.font_color, width=2)
+        self.text = self.canvas.create_text(4, 4, anchor="nw", text="", fill=self.font_color,
+                                            font=(self.art_font, 12, "bold"))
+
+    def drag_widget(self):
+        return self.canvas
+
+    def render(self, sample):
+        if sample.value is None:
+            return
+        self.points.append((sample.timestamp, sample.value))
+        while self.points and sample.timestamp - self.points[0][0] > self.span:
+            self.points.popleft()
+        self.canvas.itemconfig(self.text, text=f"{sample.value}")
+        if len(self.points) < 2:
+            return
+
+        values = [v for _, v in self.points]
+        low, high = min(values) - 5, max(values) + 5
+        start = sample.timestamp - self.span
+        coords = []
+        for t, v in self.points:
+            coords.append((t - start) / self.span * self.width)
+            coords.append(self.height - (v - low) / (high - low) * self.height)
+        self.canvas.coords(self.line, *coords)
+
+    def apply_style(self, font_color, art_font):
+        super().apply_style(font_color, art_font)
+        self.canvas.itemconfig(self.line, fill=font_color)
+        self.canvas.itemconfig(self.text, fill=font_color, font=(art_font, 12, "bold"))
+
+
+VIEW_TYPES = {
+    "number": NumberView,
+    "graph": GraphView,
+}
+
+
+def create_view(root, name, section, default_color, default_font):
+    view_type = section.get("type", "number")
+    cls = VIEW_TYPES.get(view_type)
+    if cls is None:
+        print(f"Unknown view type for {name}: {view_type}")
+        return None
+    return cls(root, name, section, default_color, default_font)
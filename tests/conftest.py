@@ -0,0 +1,5 @@
+import os
+import sys
+
+# src/ 中的模块以脚本方式运行，互相之间用顶层导入
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
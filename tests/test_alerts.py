@@ -0,0 +1,55 @@
+import configparser
+import math
+
+import pytest
+
+from alerts import AlertEngine, Rule, load_rules, rule_from_section
+
+
+def high_rule():
+    return Rule("high", 170, math.inf, 10.0, 3.0, None, None)
+
+
+def run(engine, samples):
+    events = []
+    engine.on_change = lambda rule, active, timestamp, value: events.append((rule.name, active, timestamp, value))
+    for timestamp, value in samples:
+        engine.evaluate(timestamp, value)
+    return events
+
+
+def test_pending_rule_is_dropped_when_value_leaves_range():
+    # 只有一个样本超过 170，之后落在滞回带内，不应触发
+    events = run(AlertEngine([high_rule()]), [(0, 171)] + [(t, 168) for t in range(1, 11)])
+    assert events == []
+
+
+def test_timer_restarts_after_leaving_range():
+    samples = [(0, 171), (5, 168), (6, 172), (15, 172), (16, 175)]
+    events = run(AlertEngine([high_rule()]), samples)
+    assert events == [("high", True, 16, 175)]
+
+
+def test_hysteresis_delays_clearing():
+    samples = [(0, 171), (10, 172), (11, 168), (12, 166)]
+    events = run(AlertEngine([high_rule()]), samples)
+    assert events == [("high", True, 10, 172), ("high", False, 12, 166)]
+
+
+def section(**values):
+    config = configparser.ConfigParser()
+    config["Alert test"] = {k: str(v) for k, v in values.items()}
+    return config["Alert test"]
+
+
+@pytest.mark.parametrize("zone", [-1, 6])
+def test_zone_out_of_range_is_rejected(zone):
+    with pytest.raises(ValueError):
+        rule_from_section("test", section(zone=zone))
+
+
+def test_invalid_zone_is_skipped_when_loading():
+    config = configparser.ConfigParser()
+    config["Alert bad"] = {"zone": "6"}
+    config["Alert good"] = {"zone": "5"}
+    assert [r.name for r in load_rules(config)] == ["good"]
@@ -0,0 +1,93 @@
+from failover_source import FailoverSource
+
+
+class FakeSource:
+    def __init__(self, name, readings):
+        self.name = name
+        self.readings = readings
+        self.driver = object()
+        self.fetches = 0
+
+    def start(self):
+        pass
+
+    def fetch(self):
+        self.fetches += 1
+        return self.readings()
+
+    def is_alive(self):
+        return True
+
+    def memory_usage(self):
+        return None
+
+
+class Clock:
+    def __init__(self, monkeypatch):
+        self.now = 1000.0
+        monkeypatch.setattr("failover_source.time.monotonic", lambda: self.now)
+
+
+def make_source(primary, standby):
+    source = FailoverSource(FakeSource("primary", primary), FakeSource("standby", standby),
+                            standby_interval=10.0, stale_after=5.0)
+    source.standby_ready = True
+    return source
+
+
+def tick(source, clock, count, step=0.5):
+    readings = []
+    for _ in range(count):
+        readings.append(source.fetch())
+        clock.now += step
+    return readings
+
+
+def test_fails_over_when_primary_value_is_frozen(monkeypatch):
+    clock = Clock(monkeypatch)
+    standby_value = [80]
+    source = make_source(lambda: "80", lambda: str(standby_value[0]))
+    assert set(tick(source, clock, 10)) == {"80"}
+    # 主源卡在 80，备用源已经变化；下一次低频轮询发现后，确认 confirm_after 秒再切换
+    standby_value[0] = 95
+    readings = tick(source, clock, 24)
+    assert readings[-1] == "95"
+    assert source.active == "standby"
+    assert source.failovers == 1
+    # 从发现到切换不超过 standby_interval + confirm_after
+    assert readings.index("95") <= (10.0 + 1.0) / 0.5
+
+
+def test_steady_heart_rate_keeps_standby_throttled(monkeypatch):
+    clock = Clock(monkeypatch)
+    source = make_source(lambda: "72", lambda: "72")
+    tick(source, clock, 7200)
+    # 一小时 7200 个周期，备用源只按 10 秒间隔轮询
+    assert source.standby.fetches <= 361
+    assert source.standby_polls == source.standby.fetches
+    assert source.failovers == 0
+
+
+def test_standby_updating_slightly_earlier_does_not_fail_over(monkeypatch):
+    clock = Clock(monkeypatch)
+    values = {"primary": 72, "standby": 72}
+    source = make_source(lambda: str(values["primary"]), lambda: str(values["standby"]))
+    tick(source, clock, 40)          # 心率平稳 20 秒，下一次正好是低频轮询
+    values["standby"] = 75            # 备用页面先更新
+    tick(source, clock, 1)
+    assert source.suspect_since is not None
+    values["primary"] = 75            # 主源下一个周期跟上
+    tick(source, clock, 10)
+    assert source.failovers == 0
+    assert source.active == "primary"
+    # 跟上之后恢复低频轮询
+    polls = source.standby.fetches
+    tick(source, clock, 10)
+    assert source.standby.fetches - polls <= 1
+
+
+def test_fails_over_in_same_tick_when_primary_has_no_reading(monkeypatch):
+    Clock(monkeypatch)
+    source = make_source(lambda: "N/A", lambda: "88")
+    assert source.fetch() == "88"
+    assert source.active == "standby"
@@ -0,0 +1,35 @@
+import random
+import statistics
+
+from filters import ArtifactFilter, SlidingMedian
+
+
+def feed(artifact_filter, values, start=0.0, step=0.5):
+    return [artifact_filter(start + i * step, v) for i, v in enumerate(values)]
+
+
+def test_startup_glitch_does_not_block_real_readings():
+    results = feed(ArtifactFilter(), [31, 80, 81, 80, 82, 81])
+    # 31 不能成为基准；80 附近的读数连续出现后开始接受
+    assert results[:3] == [None, None, None]
+    assert results[3:] == [80, 82, 81]
+
+
+def test_consistent_start_is_accepted_after_seed():
+    assert feed(ArtifactFilter(), [72, 73, 72, 74]) == [None, None, 72, 74]
+
+
+def test_reseeds_after_reset_after():
+    artifact_filter = ArtifactFilter()
+    feed(artifact_filter, [80, 80, 80, 80])
+    # 20 秒没有数据后心率已经变为 140，重新收集基准后接受
+    assert feed(artifact_filter, [140, 141, 140, 142], start=22.0) == [None, None, 140, 142]
+
+
+def test_sliding_median_matches_statistics():
+    median = SlidingMedian(9)
+    values = [random.randint(40, 200) for _ in range(2000)]
+    for i, value in enumerate(values):
+        median.push(value)
+        assert median.median() == statistics.median(values[max(0, i - 8):i + 1])
+    assert len(median.low) + len(median.high) <= 4 * median.window + 1
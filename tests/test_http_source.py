@@ -0,0 +1,61 @@
+import pytest
+
+from http_source import HttpSource, extract_bpm
+from soak_test import FakeStromnoServer
+
+
+class FixedHeartRate:
+    def __init__(self, value):
+        self.value = value
+
+    def current(self):
+        return self.value
+
+
+@pytest.fixture
+def server():
+    server = FakeStromnoServer(FixedHeartRate(80))
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_extract_bpm_requires_digits():
+    assert extract_bpm('<span id="widget-bpm">72</span>') == "72"
+    assert extract_bpm('<div id="widget-bpm"></div>') is None
+    assert extract_bpm('<div id="widget-bpm">--</div>') is None
+    assert extract_bpm('{"heartRate": 91}') == "91"
+    assert extract_bpm(" 64\n") == "64"
+
+
+def test_unchanged_reading_costs_a_304_on_the_same_connection(server):
+    source = HttpSource(server.url)
+    try:
+        assert source.fetch() == "80"
+        assert source.fetch() == "80"
+        assert source.fetch() == "80"
+        server.heart_rate.value = 85
+        assert source.fetch() == "85"
+    finally:
+        source.close()
+    assert source.requests == 4
+    assert source.not_modified == 2
+    assert server.not_modified == 2
+    assert source.connections == 1
+
+
+@pytest.mark.parametrize("status, value", [(500, 80), (None, None)])
+def test_failure_backs_off(server, status, value):
+    server.error_status = status
+    server.heart_rate.value = value
+    source = HttpSource(server.url)
+    try:
+        assert source.fetch() == "N/A"
+        assert source.backoff.delay == 1.0
+        requests = server.requests
+        # 退避期间不再发请求
+        assert source.fetch() == "N/A"
+        assert server.requests == requests
+        assert source.etag is None
+    finally:
+        source.close()
@@ -0,0 +1,54 @@
+import os
+import socket
+import sys
+import time
+
+import pytest
+
+from output_sinks import FifoSink, SinkWorker, UdpSink
+from pipeline import Sample
+
+
+def wait_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_udp_batch_is_flushed_after_max_latency():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(2.0)
+    port = receiver.getsockname()[1]
+    worker = SinkWorker(UdpSink(f"127.0.0.1:{port}", batch=4, max_latency=0.2))
+    try:
+        for value in (80, 81, 82):
+            worker(Sample(time.time(), str(value), value))
+            time.sleep(0.02)
+        data = receiver.recv(1024).decode()
+        assert [line.split()[1] for line in data.splitlines()] == ["80", "81", "82"]
+        assert wait_until(lambda: worker.writes == 3)
+    finally:
+        worker.stop()
+        receiver.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses mkfifo")
+def test_fifo_value_is_resent_when_reader_connects(tmp_path):
+    path = str(tmp_path / "bpm")
+    worker = SinkWorker(FifoSink(path), retry_interval=0.05)
+    try:
+        worker(Sample(time.time(), "80", 80))
+        time.sleep(0.1)
+        assert worker.writes == 0
+        reader = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            assert wait_until(lambda: worker.writes == 1)
+            assert os.read(reader, 64) == b"80\n"
+        finally:
+            os.close(reader)
+    finally:
+        worker.stop()
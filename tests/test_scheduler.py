@@ -0,0 +1,84 @@
+import threading
+import time
+
+from scheduler import TimerWheel
+
+
+def test_periods_align_to_multiples_of_tick():
+    wheel = TimerWheel(tick=0.1)
+    fired = []
+    half = wheel.register("half", 0.5, lambda: fired.append(("half", wheel.current)))
+    second = wheel.register("second", 1.0, lambda: fired.append(("second", wheel.current)))
+    quarter = wheel.register("quarter", 0.25, lambda: None)
+    assert (half.period, second.period, quarter.period) == (5, 10, 2)
+    assert (half.due, second.due) == (5, 10)
+
+    for tick in range(1, 11):
+        wheel._advance(tick)
+    # 同一周期倍数的任务在同一个 tick 执行
+    assert sorted(fired) == [("half", 5), ("half", 10), ("second", 10)]
+
+
+def test_late_wakeup_counts_missed_runs_without_catching_up():
+    wheel = TimerWheel(tick=0.1)
+    runs = []
+    task = wheel.register("task", 0.5, lambda: runs.append(wheel.current))
+    wheel._advance(23)
+    # 到期的 5 之后又错过了 10、15、20，只执行一次并对齐到下一个周期
+    assert runs == [23]
+    assert task.missed == 3
+    assert task.due == 25
+
+
+def test_late_wakeup_over_a_full_turn():
+    wheel = TimerWheel(tick=0.1, slots=8)
+    task = wheel.register("task", 0.2, lambda: None)
+    wheel._advance(21)
+    assert task.runs == 1
+    assert task.missed == 9
+    assert task.due == 22
+
+
+def test_worker_task_does_not_overlap():
+    wheel = TimerWheel(tick=0.1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(2.0)
+
+    task = wheel.register("slow", 0.1, slow, mode="worker")
+    wheel._advance(1)
+    assert started.wait(2.0)
+    wheel._advance(2)
+    wheel._advance(3)
+    assert task.missed == 2
+    release.set()
+    deadline = time.monotonic() + 2.0
+    while task.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert task.runs == 1
+    assert not task.running
+    wheel.stop()
+
+
+class BrokenRoot:
+    def after(self, delay, callback):
+        raise RuntimeError("main thread is not in main loop")
+
+
+def test_dispatch_failure_counts_as_error_and_wheel_keeps_running():
+    wheel = TimerWheel(tick=0.01, tk_root=BrokenRoot())
+    ui = wheel.register("ui", 0.02, lambda: None, mode="tk")
+    inline = wheel.register("inline", 0.02, lambda: None)
+    wheel.start()
+    try:
+        deadline = time.monotonic() + 2.0
+        while (ui.errors < 3 or inline.runs < 3) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert wheel.thread.is_alive()
+    finally:
+        wheel.stop()
+    assert ui.errors >= 3
+    assert inline.runs >= 3
@@ -0,0 +1,46 @@
+from source_watchdog import SourceWatchdog
+
+
+class HungSource:
+    """is_alive() 卡住的数据源：被调用时记录下来"""
+    name = "hung"
+
+    def __init__(self):
+        self.alive_checks = 0
+
+    def is_alive(self):
+        self.alive_checks += 1
+        return True
+
+    def restart(self):
+        pass
+
+
+def test_staleness_is_checked_before_is_alive(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("source_watchdog.time.monotonic", lambda: now[0])
+    source = HungSource()
+    watchdog = SourceWatchdog(source, stale_after=10.0)
+    now[0] += 11.0
+    assert watchdog.diagnose(now[0]) == ("no valid reading", 1000.0)
+    assert source.alive_checks == 0
+
+
+def test_check_survives_incident_finished_concurrently(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("source_watchdog.time.monotonic", lambda: now[0])
+    watchdog = SourceWatchdog(HungSource(), stale_after=10.0)
+    watchdog.incident = {"reason": "test", "detected_at": now[0], "time_to_detect": 0.0,
+                         "restarts": 1, "restarted_at": now[0]}
+    now[0] += 20.0
+
+    # 模拟数据线程在 check() 读取 incident 之后立即恢复
+    ready = watchdog.backoff.ready
+
+    def finish_then_ready(t=None):
+        watchdog.report(80)
+        return ready(t)
+
+    watchdog.backoff.ready = finish_then_ready
+    watchdog.check()
+    assert watchdog.incident is None